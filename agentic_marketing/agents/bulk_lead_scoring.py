@@ -0,0 +1,196 @@
+"""
+BulkLeadScorer: offline bulk scoring of businesses through a batch job backend.
+- Writes one scoring request per business to a JSONL batch file (same model, settings, prompt
+  and schema as LeadScoringAgentAlternative), submits it, polls until the batch finishes or
+  the timeout passes, validates every answer against LeadScoreSchema and bulk-inserts the
+  resulting Lead rows.
+- Use OpenAIBatchBackend for nightly re-scoring and LocalFileBatchBackend for tests.
+- Incremental mode only scores businesses without a lead or whose scoring inputs changed
+  since their latest lead (see utils/fingerprint.py).
+
+Usage:
+    python -m agentic_marketing.agents.bulk_lead_scoring --backend openai [--incremental] [--timeout 86400]
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from pydantic import ValidationError
+from agents import AgentOutputSchema, ModelSettings
+from agentic_marketing.agents.lead_scoring_agent_alternative import LeadScoringAgentAlternative, LeadScoreSchema
+from agentic_marketing.database import SessionLocal
+from agentic_marketing.repositories.businesses import iter_businesses_for_scoring
+from agentic_marketing.repositories.leads import build_lead_row, insert_leads
+from agentic_marketing.utils.fingerprint import business_fingerprint
+from agentic_marketing.utils.batch_backends import BatchBackend, OpenAIBatchBackend, LocalFileBatchBackend, COMPLETED, FAILED
+
+logger = logging.getLogger(__name__)
+
+# OpenAI batches complete within 24 hours; allow some time for queueing and download.
+DEFAULT_TIMEOUT_SECONDS = 26 * 3600
+# Without a responder a local batch only completes when output.jsonl is dropped in by hand.
+LOCAL_TIMEOUT_SECONDS = 600.0
+
+class BulkLeadScorer:
+    def __init__(self, backend: BatchBackend, work_dir: str = ".cache/batches",
+                 poll_interval: float = 60.0, incremental: bool = False):
+        self.backend = backend
+        self.incremental = incremental
+        self.work_dir = work_dir
+        self.poll_interval = poll_interval
+        # Scoring-input fingerprint of every business in the current batch, keyed by id.
+        self.fingerprints: Dict[int, str] = {}
+        # Reuse the interactive scorer's model, settings, prompt and instructions so both modes score alike.
+        self.prompt_source = LeadScoringAgentAlternative([])
+        self.model = self.prompt_source.agent.model
+        self.model_params = self.chat_model_params(self.prompt_source.agent.model_settings)
+        self.response_format = {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "LeadScoreSchema",
+                "schema": AgentOutputSchema(LeadScoreSchema).json_schema(),
+                "strict": True,
+            },
+        }
+
+    @staticmethod
+    def chat_model_params(settings: ModelSettings) -> Dict:
+        """
+        Chat Completions equivalents of the agent's output cap, reasoning effort and verbosity.
+        """
+        params: Dict = {"max_completion_tokens": settings.max_tokens}
+        if settings.reasoning and settings.reasoning.effort:
+            params["reasoning_effort"] = settings.reasoning.effort
+        if settings.verbosity:
+            params["verbosity"] = settings.verbosity
+        return params
+
+    def iter_businesses(self) -> Iterable[Dict]:
+        """
+        Streams the scoring inputs of every business (or, incrementally, of changed ones).
+        """
+        with SessionLocal() as session:
+            yield from iter_businesses_for_scoring(session, incremental=self.incremental)
+
+    def build_request(self, business: Dict) -> Dict:
+        return {
+            "custom_id": f"business-{business['id']}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": self.model,
+                "messages": [
+                    {"role": "system", "content": self.prompt_source.agent.instructions},
+                    {"role": "user", "content": self.prompt_source.build_prompt(business)},
+                ],
+                "response_format": self.response_format,
+                **self.model_params,
+            },
+        }
+
+    def wait_for(self, batch_id: str, timeout: Optional[float] = None) -> str:
+        started = time.monotonic()
+        while True:
+            state = self.backend.status(batch_id)
+            if state in (COMPLETED, FAILED):
+                return state
+            if timeout is not None and time.monotonic() - started > timeout:
+                raise TimeoutError(f"Batch {batch_id} still running after {timeout}s")
+            logger.info(f"Batch {batch_id} in progress; polling again in {self.poll_interval}s.")
+            time.sleep(self.poll_interval)
+
+    def write_batch_file(self, businesses: Iterable[Dict], path: str) -> int:
+        count = 0
+        self.fingerprints = {}
+        with open(path, "w", encoding="utf-8") as f:
+            for business in businesses:
+                f.write(json.dumps(self.build_request(business)) + "\n")
+                self.fingerprints[business["id"]] = business_fingerprint(business)
+                count += 1
+        return count
+
+    def parse_results(self, path: str) -> Dict[int, LeadScoreSchema]:
+        """
+        Returns validated scores keyed by business id; failed or invalid items are logged and skipped.
+        """
+        scores: Dict[int, LeadScoreSchema] = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                business_id = int(item["custom_id"].split("-", 1)[1])
+                response = item.get("response") or {}
+                if item.get("error") or response.get("status_code") != 200:
+                    logger.error(f"Batch item failed for business {business_id}: {item.get('error') or response}")
+                    continue
+                try:
+                    content = response["body"]["choices"][0]["message"]["content"]
+                    scores[business_id] = LeadScoreSchema.model_validate_json(content)
+                except (KeyError, IndexError, TypeError, ValidationError) as e:
+                    logger.error(f"Invalid batch output for business {business_id}: {e}")
+        return scores
+
+    def save_leads(self, scores: Dict[int, LeadScoreSchema]) -> int:
+        rows = [
+            build_lead_row(business_id, {"predicted_probability": s.predicted_probability, "reasoning": s.reasoning,
+                                         "input_fingerprint": self.fingerprints.get(business_id)})
+            for business_id, s in scores.items()
+        ]
+        if not rows:
+            return 0
+        with SessionLocal() as session:
+            ids = insert_leads(session, rows)
+            session.commit()
+        return len(ids)
+
+    def run(self, businesses: Optional[Iterable[Dict]] = None, timeout: Optional[float] = None) -> Dict:
+        """
+        Scores `businesses` (default: the whole businesses table, or only changed businesses
+        in incremental mode) and saves the leads. Raises TimeoutError if the batch has not
+        finished after `timeout` seconds.
+        """
+        if timeout is None and isinstance(self.backend, LocalFileBatchBackend) and self.backend.responder is None:
+            raise ValueError("A local batch without a responder needs a timeout; it would otherwise wait forever.")
+        os.makedirs(self.work_dir, exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        input_path = os.path.join(self.work_dir, f"lead_scoring_{stamp}_input.jsonl")
+        output_path = os.path.join(self.work_dir, f"lead_scoring_{stamp}_output.jsonl")
+        submitted = self.write_batch_file(businesses if businesses is not None else self.iter_businesses(), input_path)
+        if not submitted:
+            return {"submitted": 0, "scored": 0, "saved": 0, "batch_id": None}
+        batch_id = self.backend.submit(input_path)
+        logger.info(f"Submitted batch {batch_id} with {submitted} businesses.")
+        if self.wait_for(batch_id, timeout) == FAILED:
+            raise RuntimeError(f"Batch {batch_id} failed.")
+        scores = self.parse_results(self.backend.download_results(batch_id, output_path))
+        saved = self.save_leads(scores)
+        logger.info(f"Batch {batch_id}: {len(scores)}/{submitted} valid scores, saved {saved} leads.")
+        return {"submitted": submitted, "scored": len(scores), "saved": saved, "batch_id": batch_id}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-score every business through a batch job.")
+    parser.add_argument("--backend", choices=["openai", "local"], default="openai")
+    parser.add_argument("--work-dir", default=".cache/batches")
+    parser.add_argument("--poll-interval", type=float, default=60.0)
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only score businesses that have no lead or whose inputs changed.")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help=f"Seconds to wait for the batch (default: {DEFAULT_TIMEOUT_SECONDS} for openai, "
+                             f"{LOCAL_TIMEOUT_SECONDS:.0f} for local).")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.backend == "openai":
+        backend, timeout = OpenAIBatchBackend(), DEFAULT_TIMEOUT_SECONDS
+    else:
+        backend, timeout = LocalFileBatchBackend(), LOCAL_TIMEOUT_SECONDS
+    print(BulkLeadScorer(backend, work_dir=args.work_dir, poll_interval=args.poll_interval,
+                         incremental=args.incremental).run(timeout=args.timeout if args.timeout is not None else timeout))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+LeadPreFilter: a cheap local stage that runs before LLM lead scoring.
+- Rules exclude businesses whose outcome is certain (already has a website, permanently closed).
+- An optional TF-IDF + logistic regression model, trained on earlier LLM scores, settles
+  businesses it is confident about (probability <= low or >= high).
+- Everything else is left for the LLM. Without a trained model (or without scikit-learn)
+  only the rules apply.
+
+Usage:
+    python -m agentic_marketing.agents.lead_prefilter --train
+"""
+import argparse
+import logging
+import os
+import pickle
+from typing import Dict, List, Optional, Tuple
+from agentic_marketing.config import PREFILTER_MODEL_PATH, PREFILTER_LOW_THRESHOLD, PREFILTER_HIGH_THRESHOLD
+from agentic_marketing.database import SessionLocal
+from agentic_marketing.repositories.leads import PREFILTER_PREFIX, select_latest_llm_scores
+from agentic_marketing.utils.fingerprint import business_fingerprint
+
+logger = logging.getLogger(__name__)
+
+CLOSED_MARKERS = ("permanently closed", "closed permanently", "out of business")
+MIN_TRAINING_LEADS = 50
+
+
+def business_text(business: Dict) -> str:
+    return " ".join(str(business.get(field) or "") for field in ("name", "industry", "description", "yelp_description"))
+
+
+def _result(business: Dict, probability: float, reasoning: str) -> Dict:
+    return {
+        # The prefix keeps locally settled leads out of the training data.
+        "reasoning": PREFILTER_PREFIX + reasoning,
+        "predicted_probability": probability,
+        "input_fingerprint": business_fingerprint(business),
+    }
+
+
+class LeadPreFilter:
+    def __init__(self, model=None, low: float = PREFILTER_LOW_THRESHOLD, high: float = PREFILTER_HIGH_THRESHOLD):
+        self.model = model
+        self.low = low
+        self.high = high
+
+    @classmethod
+    def load(cls, path: str = PREFILTER_MODEL_PATH, **kwargs) -> "LeadPreFilter":
+        """
+        Loads the trained model from `path`; falls back to rules only if there is none.
+        """
+        model = None
+        if os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    model = pickle.load(f)
+            except Exception as e:
+                logger.warning(f"Could not load pre-filter model from {path}, using rules only: {e}")
+        return cls(model, **kwargs)
+
+    def apply_rules(self, business: Dict) -> Optional[Dict]:
+        if business.get("website"):
+            return _result(business, 0.0, "already has a website.")
+        text = business_text(business).lower()
+        if any(marker in text for marker in CLOSED_MARKERS):
+            return _result(business, 0.0, "business appears to be closed.")
+        return None
+
+    def split(self, businesses: List[Dict]) -> Tuple[Dict[int, Dict], List[Dict]]:
+        """
+        Returns (results keyed by position in `businesses`, businesses left for the LLM).
+        """
+        decided: Dict[int, Dict] = {}
+        pending: List[int] = []
+        for index, business in enumerate(businesses):
+            result = self.apply_rules(business)
+            if result is not None:
+                decided[index] = result
+            else:
+                pending.append(index)
+        if self.model is not None and pending:
+            probabilities = self.model.predict_proba([business_text(businesses[i]) for i in pending])[:, 1]
+            for index, probability in zip(pending, probabilities):
+                probability = float(probability)
+                if probability <= self.low or probability >= self.high:
+                    decided[index] = _result(businesses[index], probability,
+                                             f"local model estimate ({probability:.2f}) from similar scored businesses.")
+        ambiguous = [businesses[i] for i in pending if i not in decided]
+        logger.info(f"Pre-filter settled {len(decided)} of {len(businesses)} businesses; {len(ambiguous)} go to the LLM.")
+        return decided, ambiguous
+
+
+def load_training_data() -> Tuple[List[str], List[int]]:
+    """
+    Texts and labels (predicted_probability >= 0.5) from the latest LLM-scored lead of each business.
+    """
+    with SessionLocal() as session:
+        rows = [row._asdict() for row in session.execute(select_latest_llm_scores())]
+    return [business_text(row) for row in rows], [int(row["predicted_probability"] >= 0.5) for row in rows]
+
+
+def train(path: str = PREFILTER_MODEL_PATH) -> Dict:
+    # scikit-learn is only needed to train and to run a trained model.
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+
+    texts, labels = load_training_data()
+    if len(texts) < MIN_TRAINING_LEADS or len(set(labels)) < 2:
+        raise ValueError(f"Need at least {MIN_TRAINING_LEADS} scored leads covering both outcomes, got {len(texts)}.")
+    model = make_pipeline(
+        TfidfVectorizer(ngram_range=(1, 2), min_df=2, max_features=50000, sublinear_tf=True),
+        LogisticRegression(max_iter=1000, class_weight="balanced"),
+    )
+    model.fit(texts, labels)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as f:
+        pickle.dump(model, f)
+    return {"path": path, "examples": len(texts), "positives": sum(labels)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the local lead pre-filter model.")
+    parser.add_argument("--train", action="store_true", help="Train on existing LLM-scored leads.")
+    parser.add_argument("--path", default=PREFILTER_MODEL_PATH)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.train:
+        print(train(args.path))
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+LeadScoreIndex: reuses LLM scores of similar, already scored businesses.
+- Businesses are embedded on CPU with sentence-transformers (normalized, so a dot product is the
+  cosine similarity) and kept on disk under SCORE_INDEX_DIR.
+- estimate() looks up the k nearest scored businesses and returns a similarity-weighted probability
+  and a confidence: the mean similarity of the neighbours, discounted when their scores disagree.
+- split() accepts estimates with confidence >= min_confidence and leaves the rest for the LLM.
+- rebuild() re-embeds the latest LLM score of every business; add() inserts new scores incrementally.
+
+Usage:
+    python -m agentic_marketing.agents.lead_score_index --rebuild
+"""
+import argparse
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+from agentic_marketing.config import SCORE_INDEX_DIR, SCORE_INDEX_MODEL, SCORE_INDEX_K, SCORE_INDEX_MIN_CONFIDENCE
+from agentic_marketing.database import SessionLocal
+from agentic_marketing.agents.lead_prefilter import business_text
+from agentic_marketing.repositories.leads import NEIGHBOUR_PREFIX, select_latest_llm_scores
+from agentic_marketing.utils.fingerprint import business_fingerprint
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = "vectors.npy"
+ENTRIES_FILE = "entries.json"
+REBUILD_BATCH_SIZE = 256
+
+
+class LeadScoreIndex:
+    def __init__(self, path: str = SCORE_INDEX_DIR, model_name: str = SCORE_INDEX_MODEL,
+                 k: int = SCORE_INDEX_K, min_confidence: float = SCORE_INDEX_MIN_CONFIDENCE):
+        self.path = path
+        self.model_name = model_name
+        self.k = k
+        self.min_confidence = min_confidence
+        self._model = None
+        self.vectors = None
+        # One entry per indexed business: business_id, probability, row position in self.vectors.
+        self.entries: List[Dict] = []
+        self._positions: Dict[int, int] = {}
+        self.load()
+
+    @property
+    def model(self):
+        if self._model is None:
+            # Imported lazily: loading torch is slow and only needed once something is embedded.
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name, device="cpu")
+        return self._model
+
+    def embed(self, businesses: List[Dict]):
+        return self.model.encode([business_text(b) for b in businesses], batch_size=64,
+                                 normalize_embeddings=True, convert_to_numpy=True)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def load(self):
+        vectors_path = os.path.join(self.path, VECTORS_FILE)
+        entries_path = os.path.join(self.path, ENTRIES_FILE)
+        if not (os.path.exists(vectors_path) and os.path.exists(entries_path)):
+            return
+        import numpy as np
+        self.vectors = np.load(vectors_path)
+        with open(entries_path, encoding="utf-8") as f:
+            self.entries = json.load(f)
+        self._positions = {entry["business_id"]: i for i, entry in enumerate(self.entries)}
+
+    def save(self):
+        import numpy as np
+        os.makedirs(self.path, exist_ok=True)
+        # Write to temporary files first so readers never see a half-written index.
+        vectors_tmp = os.path.join(self.path, "vectors.tmp.npy")
+        entries_tmp = os.path.join(self.path, ENTRIES_FILE + ".tmp")
+        np.save(vectors_tmp, self.vectors)
+        with open(entries_tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(vectors_tmp, os.path.join(self.path, VECTORS_FILE))
+        os.replace(entries_tmp, os.path.join(self.path, ENTRIES_FILE))
+
+    def add(self, scored: List[Tuple[Dict, float]], save: bool = True) -> int:
+        """
+        Inserts or replaces (business, predicted_probability) pairs; businesses need an id.
+        """
+        import numpy as np
+        scored = [(b, p) for b, p in scored if b.get("id") is not None and p is not None]
+        if not scored:
+            return 0
+        vectors = self.embed([b for b, _ in scored])
+        new_rows = []
+        for (business, probability), vector in zip(scored, vectors):
+            entry = {"business_id": business["id"], "probability": float(probability),
+                     "input_fingerprint": business_fingerprint(business)}
+            position = self._positions.get(business["id"])
+            if position is not None:
+                self.vectors[position] = vector
+                self.entries[position] = entry
+            else:
+                self._positions[business["id"]] = len(self.entries)
+                self.entries.append(entry)
+                new_rows.append(vector)
+        if new_rows:
+            stacked = np.vstack(new_rows)
+            self.vectors = stacked if self.vectors is None else np.vstack([self.vectors, stacked])
+        if save:
+            self.save()
+        return len(scored)
+
+    def rebuild(self) -> int:
+        """
+        Re-embeds the latest LLM score of every business and replaces the stored index.
+        """
+        self.vectors, self.entries, self._positions = None, [], {}
+        batch: List[Tuple[Dict, float]] = []
+        with SessionLocal() as session:
+            for row in session.execute(select_latest_llm_scores().execution_options(yield_per=REBUILD_BATCH_SIZE)):
+                row = row._asdict()
+                batch.append(({**row, "id": row["business_id"]}, row["predicted_probability"]))
+                if len(batch) >= REBUILD_BATCH_SIZE:
+                    self.add(batch, save=False)
+                    batch = []
+        self.add(batch, save=False)
+        if self.vectors is not None:
+            self.save()
+        return len(self.entries)
+
+    def estimate(self, businesses: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Returns, per business, {"predicted_probability", "confidence", "neighbours"} or None when the
+        index has fewer than k entries. A business never counts as its own neighbour.
+        """
+        import numpy as np
+        if self.vectors is None or len(self.entries) < self.k or not businesses:
+            return [None] * len(businesses)
+        similarities = self.embed(businesses) @ self.vectors.T
+        estimates: List[Optional[Dict]] = []
+        for business, row in zip(businesses, similarities):
+            own = self._positions.get(business.get("id"))
+            if own is not None:
+                row[own] = -np.inf
+            nearest = np.argsort(-row)[:self.k]
+            sims = np.clip(row[nearest], 0.0, 1.0)
+            probabilities = np.array([self.entries[i]["probability"] for i in nearest])
+            if sims.sum() == 0:
+                estimates.append(None)
+                continue
+            probability = float(np.average(probabilities, weights=sims))
+            spread = float(np.sqrt(np.average((probabilities - probability) ** 2, weights=sims)))
+            estimates.append({
+                "predicted_probability": probability,
+                "confidence": float(sims.mean()) * max(0.0, 1.0 - 2.0 * spread),
+                "neighbours": [self.entries[i]["business_id"] for i in nearest],
+            })
+        return estimates
+
+    def split(self, businesses: List[Dict]) -> Tuple[Dict[int, Dict], List[Dict]]:
+        """
+        Returns (results keyed by position in `businesses`, businesses left for the LLM).
+        """
+        decided: Dict[int, Dict] = {}
+        for index, estimate in enumerate(self.estimate(businesses)):
+            if estimate is not None and estimate["confidence"] >= self.min_confidence:
+                decided[index] = {
+                    # The prefix keeps reused scores out of the index and the pre-filter training data.
+                    "reasoning": NEIGHBOUR_PREFIX + f"{estimate['predicted_probability']:.2f} from similar scored businesses "
+                                 f"{estimate['neighbours']} (confidence {estimate['confidence']:.2f}).",
+                    "predicted_probability": estimate["predicted_probability"],
+                    "input_fingerprint": business_fingerprint(businesses[index]),
+                }
+        logger.info(f"Score index settled {len(decided)} of {len(businesses)} businesses.")
+        return decided, [b for i, b in enumerate(businesses) if i not in decided]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the nearest-neighbour lead score index.")
+    parser.add_argument("--rebuild", action="store_true", help="Re-embed every LLM-scored business.")
+    parser.add_argument("--path", default=SCORE_INDEX_DIR)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.rebuild:
+        print({"path": args.path, "entries": LeadScoreIndex(args.path).rebuild()})
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,68 +1,131 @@
 """
 LeadScoringAgent: Scores businesses for likelihood to benefit from a website, predicts ROI and probability using LLM, and ranks leads.
+- Uses a shared AsyncOpenAI client (one pooled HTTP connection pool per process), so scoring
+  never blocks the event loop and can run inside the FastAPI app.
+- Businesses are scored concurrently, each call bounded by a timeout and the shared rate limiter.
+- Prompt fields are fitted to SCORING_PROMPT_TOKEN_BUDGET; MAX_OUTPUT_TOKENS covers the
+  reasoning tokens plus the short JSON answer.
 """
 import asyncio
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Optional
 from urllib import response
-from agentic_marketing.models import Business, Lead
+import httpx
 from agentic_marketing.database import AsyncSessionLocal
-from sqlalchemy.ext.asyncio import AsyncSession
-from agentic_marketing.config import OPENAI_API_KEY
-from openai import OpenAI
+from agentic_marketing.repositories.leads import async_insert_leads, build_lead_row, rank_lead_rows
+from agentic_marketing.config import (
+    OPENAI_API_KEY, OPENAI_MAX_CONCURRENCY, OPENAI_REQUEST_TIMEOUT_SECONDS, SCORING_PROMPT_TOKEN_BUDGET,
+)
+from agentic_marketing.utils.rate_limit import RateLimiter, estimate_tokens, retry_with_backoff
+from agentic_marketing.utils.llm_cache import get_llm_cache, llm_cache_key
+from agentic_marketing.utils.fingerprint import business_fingerprint
+from agentic_marketing.utils.prompt_budget import PromptBudget
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
 logger = logging.getLogger(__name__)
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+openai_client = AsyncOpenAI(
+    api_key=OPENAI_API_KEY,
+    timeout=OPENAI_REQUEST_TIMEOUT_SECONDS,
+    # Retries are handled by retry_with_backoff so they also respect the rate limiter.
+    max_retries=0,
+    http_client=DefaultAsyncHttpxClient(
+        limits=httpx.Limits(max_connections=OPENAI_MAX_CONCURRENCY * 2, max_keepalive_connections=OPENAI_MAX_CONCURRENCY),
+    ),
+)
+
+MODEL = "o4-mini"
+INSTRUCTIONS = "You are a business analyst."
+REASONING = {
+    "effort": "low",
+    "summary": "auto"
+    }
+# Reasoning tokens count against this cap; the JSON answer itself is a few hundred tokens.
+MAX_OUTPUT_TOKENS = 3000
+TEMPERATURE = 0.5
+PROMPT_BUDGET = PromptBudget(SCORING_PROMPT_TOKEN_BUDGET,
+                             {"description": 500, "social_media": 200, "trends": 450})
 
 class LeadScoringAgent:
-    def __init__(self, businesses: List[Dict]):
+    def __init__(self, businesses: List[Dict], limiter: Optional[RateLimiter] = None,
+                 timeout: float = OPENAI_REQUEST_TIMEOUT_SECONDS):
         self.businesses = businesses
+        self.limiter = limiter or RateLimiter()
+        self.timeout = timeout
+
+    async def _create_response(self, prompt: str):
+        async with self.limiter.limit(estimate_tokens(prompt) + MAX_OUTPUT_TOKENS):
+            # wait_for cancels the request if it outlives the per-call timeout.
+            return await asyncio.wait_for(
+                openai_client.responses.create(
+                    model=MODEL,
+                    instructions=INSTRUCTIONS,
+                    reasoning=REASONING,
+                    input=[                    
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_output_tokens=MAX_OUTPUT_TOKENS,
+                    temperature=TEMPERATURE,
+                ),
+                timeout=self.timeout,
+            )
 
     async def score_business(self, business: Dict) -> Dict:
         """
         Use LLM to reason about ROI and probability for a business.
         """
+        fields = PROMPT_BUDGET.fit({
+            "description": business.get('description'),
+            "social_media": business.get('social_media'),
+            "trends": business.get('trends'),
+        })
         prompt = f"""
         Given the following business info:
         Name: {business.get('name')}
         Region: {business.get('region')}
         Industry: {business.get('industry')}
-        Description: {business.get('description')}
-        Social Media: {business.get('social_media', '')}
-        Recent Trends: {business.get('trends', '')}
+        Description: {fields['description']}
+        Social Media: {fields['social_media']}
+        Recent Trends: {fields['trends']}
         Reason about how much this business would benefit from having a website for their business. Predict the ROI (as a float, 0-100) and the probability (0-1) that they would benefit, based on market trends and interests. Explain your reasoning.
         Return a JSON object with keys: reasoning, predicted_ROI, predicted_probability.
         """
+        cache = get_llm_cache()
+        cache_key = llm_cache_key(MODEL, INSTRUCTIONS, "reasoning, predicted_ROI, predicted_probability", prompt,
+                                  {"reasoning": REASONING, "max_output_tokens": MAX_OUTPUT_TOKENS, "temperature": TEMPERATURE})
         try:
-            response = openai_client.responses.create(
-                model="o4-mini",
-                instructions="You are a business analyst.",
-                reasoning={
-                    "effort": "medium",
-                    "summary": "auto"
-                    },
-                input=[                    
-                    {"role": "user", "content": prompt}
-                ],
-                max_output_tokens=20000,
-                temperature=0.5,
-            )
-            # OpenAI API returns 'choices' with 'message' or 'text'
-            # content = response.choices[0].message.get('content') if hasattr(response.choices[0], 'message') else response.choices[0].get('text')
-            if response.status == "incomplete" and response.incomplete_details == "max_output_tokens":
-                print("Ran out of tokens")
-            if response.output_text:
-                print("Partial output:", response.output_text)
-            else: 
-                print("Ran out of tokens during reasoning")
+            content = cache.get(cache_key) if cache else None
+            cached = content is not None
+            if not cached:
+                response = await retry_with_backoff(lambda: self._create_response(prompt))
+                # OpenAI API returns 'choices' with 'message' or 'text'
+                # content = response.choices[0].message.get('content') if hasattr(response.choices[0], 'message') else response.choices[0].get('text')
+                if response.status == "incomplete" and response.incomplete_details \
+                        and response.incomplete_details.reason == "max_output_tokens":
+                    logger.warning("Ran out of output tokens scoring %s", business.get('name'))
+                if response.output_text:
+                    logger.debug("Output for %s: %s", business.get('name'), response.output_text)
+                else:
+                    logger.warning("Ran out of tokens during reasoning scoring %s", business.get('name'))
+                content = response.output_text
 
-            content = response.output_text
             import json
             result = json.loads(content)
+            # Only answers that parsed are worth replaying.
+            if cache and not cached:
+                cache.set(cache_key, content)
             return {
                 "reasoning": result.get("reasoning"),
                 "predicted_ROI": float(result.get("predicted_ROI", 0)),
-                "predicted_probability": float(result.get("predicted_probability", 0))
+                "predicted_probability": float(result.get("predicted_probability", 0)),
+                # Failed scorings keep no fingerprint, so incremental runs retry them.
+                "input_fingerprint": business_fingerprint(business)
+            }
+        except asyncio.TimeoutError:
+            logger.error(f"LLM scoring timed out after {self.timeout}s for {business.get('name')}")
+            return {
+                "reasoning": "LLM timeout",
+                "predicted_ROI": 0.0,
+                "predicted_probability": 0.0
             }
         except Exception as e:
             logger.error(f"LLM scoring error: {e}")
@@ -75,24 +138,16 @@ class LeadScoringAgent:
     async def process_and_save_leads(self):
         """
         Score all businesses, rank, and save to leads table.
+        Returns the saved lead rows (with their new ids), ranked by predicted_probability.
         """
-        scored_leads = []
-        for business in self.businesses:
-            result = await self.score_business(business)
-            lead = Lead(
-                business_id=business.get('id'),
-                score=result["predicted_probability"],
-                predicted_ROI=result["predicted_ROI"],
-                predicted_probability=result["predicted_probability"],
-                reasoning=result["reasoning"]
-            )
-            scored_leads.append(lead)
-        # Rank by predicted_probability
-        scored_leads.sort(key=lambda l: l.predicted_probability, reverse=True)
-        # Save to DB
+        # Cancelling this coroutine cancels every in-flight scoring call with it.
+        scores = await asyncio.gather(*(self.score_business(b) for b in self.businesses))
+        # predicted_ROI is not stored on Lead; it stays in the score_business() result only.
+        scored_leads = rank_lead_rows(build_lead_row(business.get('id'), result) for business, result in zip(self.businesses, scores))
         async with AsyncSessionLocal() as session:
-            for lead in scored_leads:
-                session.add(lead)
+            ids = await async_insert_leads(session, scored_leads)
             await session.commit()
+        for lead, lead_id in zip(scored_leads, ids):
+            lead["id"] = lead_id
         logger.info(f"Saved {len(scored_leads)} leads to database.")
         return scored_leads
@@ -1,55 +1,158 @@
 """
 LeadScoringAgentAlternative: Uses OpenAI Agents SDK to score businesses for likelihood to benefit from a website, predicts probability of conversion, and ranks leads.
+- Businesses are scored concurrently through the async runner, within the configured
+  concurrency, requests-per-minute and tokens-per-minute limits, retrying 429s and 5xx errors.
+- Descriptions and trends are fitted to SCORING_PROMPT_TOKEN_BUDGET, and the answer is capped
+  at EXPECTED_OUTPUT_TOKENS plus headroom for the model's reasoning tokens.
+- With batch_size > 1, businesses sharing a sector and trends text are scored batch_size at a
+  time in one request (trends included once, answers keyed by business id). Items missing
+  from or invalid in a batch answer are re-scored one by one.
+- An optional LeadPreFilter settles obvious businesses locally, and an optional LeadScoreIndex
+  reuses scores of near-identical scored businesses; only the rest reach the LLM.
 """
+import asyncio
 import logging
-from typing import List, Dict
-from agentic_marketing.models import Lead
-from agentic_marketing.database import AsyncSessionLocal
-from agentic_marketing.config import OPENAI_API_KEY
+from typing import List, Dict, Optional, Tuple
+from agentic_marketing.repositories.leads import build_lead_row, insert_leads, rank_lead_rows
+from agentic_marketing.config import OPENAI_API_KEY, SCORING_PROMPT_TOKEN_BUDGET, LEAD_SCORING_BATCH_SIZE, LEAD_SCORING_MODEL
+from agentic_marketing.utils.concurrency import run_sync
+from agentic_marketing.utils.rate_limit import RateLimiter, estimate_tokens, retry_with_backoff
+from agentic_marketing.utils.llm_cache import run_agent_cached
+from agentic_marketing.utils.fingerprint import business_fingerprint
+from agentic_marketing.utils.prompt_budget import PromptBudget
+from agentic_marketing.utils.model_settings import capped_model_settings, reasoning_allowance
 import os
 os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
 
 # OpenAI Agents SDK imports
 from agents import Agent, Runner
+from agents.models import get_default_model
 from pydantic import BaseModel, Field, ValidationError
 
 logger = logging.getLogger(__name__)
 
+# Pinned so the bulk scorer (agents/bulk_lead_scoring.py) scores with the same model and settings.
+SCORING_MODEL = LEAD_SCORING_MODEL or get_default_model()
+# Budgeted answer tokens per scored business: a short reasoning paragraph plus a float.
+# Reasoning tokens are budgeted on top by capped_model_settings().
+EXPECTED_OUTPUT_TOKENS = 400
+PROMPT_BUDGET = PromptBudget(SCORING_PROMPT_TOKEN_BUDGET,
+                             {"description": 500, "yelp_description": 250, "trends": 450})
+
 class LeadScoreSchema(BaseModel):
     reasoning: str = Field(..., description="LLM reasoning about business potential ROI and probability of conversion.")    
     predicted_probability: float = Field(..., ge=0, le=1, description="Probability of conversion (0-1)")
 
+class BatchLeadScoreItem(BaseModel):
+    # No bounds here: one out-of-range item must not invalidate the whole batch answer.
+    # Each item is validated against LeadScoreSchema on its own.
+    business_id: int = Field(..., description="The business id given in the prompt.")
+    reasoning: str
+    predicted_probability: float
+
+class BatchLeadScoreSchema(BaseModel):
+    scores: List[BatchLeadScoreItem] = Field(..., description="One entry per business in the prompt.")
+
 class LeadScoringAgentAlternative:
-    def __init__(self, businesses: List[Dict]):
+    def __init__(self, businesses: List[Dict], limiter: Optional[RateLimiter] = None,
+                 batch_size: int = LEAD_SCORING_BATCH_SIZE, prefilter=None, score_index=None):
         self.businesses = businesses
+        # Pass a shared limiter to keep several scorers inside one account quota.
+        self.limiter = limiter or RateLimiter()
+        self.batch_size = max(1, batch_size)
+        # Local stages tried before the LLM, in order: a LeadPreFilter (agents/lead_prefilter.py)
+        # and a LeadScoreIndex (agents/lead_score_index.py). Either may be None.
+        self.prefilter = prefilter
+        self.score_index = score_index
+        # (business, result) pairs scored by the LLM in the last score_businesses() call.
+        self.llm_scored: List[Tuple[Dict, Dict]] = []
+        self.agent = self.build_agent()
+        self.batch_agent = self.build_batch_agent() if self.batch_size > 1 else None
+
+    def build_agent(self) -> Agent:
+        return Agent(
+            name="LeadScorer",
+            instructions="You are a business analyst. Reason about the probability for website benefit.",
+            output_type=LeadScoreSchema,
+            model=SCORING_MODEL,
+            model_settings=capped_model_settings(EXPECTED_OUTPUT_TOKENS, SCORING_MODEL),
+        )
 
     def build_prompt(self, business: Dict) -> str:
+        fields = PROMPT_BUDGET.fit({
+            "description": business.get('description'),
+            "yelp_description": business.get('yelp_description'),
+            "trends": business.get('trends'),
+        })
         return f"""
         Given the following business info:
         Name: {business.get('name')}
         Region: {business.get('region')}
         Industry: {business.get('industry')}
-        Description: {business.get('description', '')}
-        Yelp Description: {business.get('yelp_description', '')}
-        Recent Trends in this sector: {business.get('trends', '')}
+        Description: {fields['description']}
+        Yelp Description: {fields['yelp_description']}
+        Recent Trends in this sector: {fields['trends']}
         Reason about how much this business would benefit from having a website for their business. Predict the probability (0-1) that they would benefit, based on market trends and interests. Explain your reasoning.
         Return a JSON object with keys: reasoning, predicted_probability.
         """
 
+    def build_batch_agent(self) -> Agent:
+        return Agent(
+            name="BatchLeadScorer",
+            instructions="You are a business analyst. Reason about the probability for website benefit, "
+                         "scoring each business independently.",
+            output_type=BatchLeadScoreSchema,
+            model=SCORING_MODEL,
+            model_settings=capped_model_settings(EXPECTED_OUTPUT_TOKENS * self.batch_size, SCORING_MODEL),
+        )
+
+    def build_batch_prompt(self, businesses: List[Dict]) -> str:
+        # Every business in a batch shares the same trends text, so it is sent once.
+        trends = PROMPT_BUDGET.fit({"trends": businesses[0].get('trends')})["trends"]
+        entries = []
+        for business in businesses:
+            fields = PROMPT_BUDGET.fit({
+                "description": business.get('description'),
+                "yelp_description": business.get('yelp_description'),
+            })
+            entries.append(f"""
+        Business ID: {business.get('id')}
+        Name: {business.get('name')}
+        Region: {business.get('region')}
+        Industry: {business.get('industry')}
+        Description: {fields['description']}
+        Yelp Description: {fields['yelp_description']}""")
+        listing = "\n".join(entries)
+        return f"""
+        Recent Trends in this sector: {trends}
+
+        Given the following businesses:
+        {listing}
+
+        For each business, reason about how much it would benefit from having a website. Predict the probability (0-1) that it would benefit, based on market trends and interests. Explain your reasoning.
+        Return a JSON object with key scores: a list with one entry per business, each with keys business_id, reasoning, predicted_probability.
+        """
+
     def score_business(self, business: Dict) -> Dict:
+        return run_sync(self.score_business_async(business))
+
+    async def _run_limited(self, prompt: str, agent: Optional[Agent] = None, output_tokens: Optional[int] = None):
+        # Reserves the agent's whole output cap unless the caller knows the call needs less.
+        agent = agent or self.agent
+        async with self.limiter.limit(estimate_tokens(prompt) + (output_tokens or agent.model_settings.max_tokens)):
+            return await Runner.run(agent, prompt)
+
+    async def score_business_async(self, business: Dict) -> Dict:
         prompt = self.build_prompt(business)
-        agent = Agent(
-            name="LeadScorer",
-            instructions="You are a business analyst. Reason about the probability for website benefit.",
-            output_type=LeadScoreSchema
-        )
-        result = Runner.run_sync(agent, prompt)
         try:
-            # result.final_output is already validated by Pydantic
-            parsed = result.final_output
+            # Cached answers skip the rate limiter and the API entirely.
+            # The final output is already validated by Pydantic
+            parsed = await run_agent_cached(self.agent, prompt, run=lambda: retry_with_backoff(lambda: self._run_limited(prompt)))
             return {
                 "reasoning": parsed.reasoning,                
-                "predicted_probability": parsed.predicted_probability
+                "predicted_probability": parsed.predicted_probability,
+                # Failed scorings keep no fingerprint, so incremental runs retry them.
+                "input_fingerprint": business_fingerprint(business)
             }
         except ValidationError as ve:
             logger.error(f"Pydantic validation error: {ve}")
@@ -64,31 +167,106 @@ class LeadScoringAgentAlternative:
                 "predicted_probability": 0.0
             }
 
+    async def score_batch_async(self, businesses: List[Dict]) -> Dict[int, Dict]:
+        """
+        Scores businesses that share a sector and trends in one request. Returns results keyed by
+        business id for the items that came back valid; the caller re-scores the rest.
+        """
+        prompt = self.build_batch_prompt(businesses)
+        output_tokens = EXPECTED_OUTPUT_TOKENS * len(businesses) + reasoning_allowance(self.batch_agent.model_settings, SCORING_MODEL)
+        try:
+            parsed = await run_agent_cached(
+                self.batch_agent, prompt,
+                run=lambda: retry_with_backoff(lambda: self._run_limited(prompt, self.batch_agent, output_tokens)),
+            )
+        except Exception as e:
+            logger.error(f"Batch scoring error for {len(businesses)} businesses: {e}")
+            return {}
+        by_id = {b.get('id'): b for b in businesses}
+        results: Dict[int, Dict] = {}
+        for item in parsed.scores:
+            business = by_id.get(item.business_id)
+            if business is None or item.business_id in results:
+                logger.warning(f"Ignoring batch score for unexpected business id {item.business_id}")
+                continue
+            try:
+                score = LeadScoreSchema(reasoning=item.reasoning, predicted_probability=item.predicted_probability)
+            except ValidationError as ve:
+                logger.warning(f"Invalid batch score for business {item.business_id}: {ve}")
+                continue
+            results[item.business_id] = {
+                "reasoning": score.reasoning,
+                "predicted_probability": score.predicted_probability,
+                "input_fingerprint": business_fingerprint(business),
+            }
+        return results
+
+    def batch_groups(self, businesses: List[Dict]) -> List[List[Dict]]:
+        """
+        Chunks businesses with an id into batches of at most batch_size that share industry and trends.
+        """
+        groups: Dict[Tuple, List[Dict]] = {}
+        for business in businesses:
+            if business.get('id') is not None:
+                groups.setdefault((business.get('industry'), business.get('trends')), []).append(business)
+        return [group[start:start + self.batch_size]
+                for group in groups.values() for start in range(0, len(group), self.batch_size)]
+
+    async def score_with_llm(self, businesses: List[Dict]) -> List[Dict]:
+        """
+        Scores businesses concurrently with the LLM; results are returned in input order.
+        """
+        if self.batch_size == 1:
+            return list(await asyncio.gather(*(self.score_business_async(b) for b in businesses)))
+        batched: Dict[int, Dict] = {}
+        for results in await asyncio.gather(*(self.score_batch_async(batch) for batch in self.batch_groups(businesses))):
+            batched.update(results)
+        fallback = [b for b in businesses if b.get('id') not in batched]
+        if fallback:
+            logger.info(f"Scoring {len(fallback)} of {len(businesses)} businesses individually.")
+        singles = await asyncio.gather(*(self.score_business_async(b) for b in fallback))
+        single_results = {id(b): result for b, result in zip(fallback, singles)}
+        return [batched.get(b.get('id')) or single_results[id(b)] for b in businesses]
+
+    async def score_businesses(self) -> List[Dict]:
+        """
+        Scores all businesses, settling what the local stages can; results are returned in input order.
+        """
+        results: Dict[int, Dict] = {}
+        pending = list(range(len(self.businesses)))
+        for stage in (self.prefilter, self.score_index):
+            if stage is None or not pending:
+                continue
+            decided, _ = stage.split([self.businesses[i] for i in pending])
+            results.update({pending[j]: result for j, result in decided.items()})
+            pending = [i for j, i in enumerate(pending) if j not in decided]
+        llm_results = await self.score_with_llm([self.businesses[i] for i in pending])
+        results.update(zip(pending, llm_results))
+        self.llm_scored = [(self.businesses[i], result) for i, result in zip(pending, llm_results)]
+        return [results[i] for i in range(len(self.businesses))]
+
     def process_and_save_leads(self):
         from agentic_marketing.database import SessionLocal
         results = []
-        scored_leads = []
-        for business in self.businesses:
-            result = self.score_business(business)
-            lead = Lead(
-                business_id=business.get('id'),
-                score=result["predicted_probability"],                
-                predicted_probability=result["predicted_probability"],
-                reasoning=result["reasoning"]                
-            )
-            scored_leads.append(lead)
+        scores = run_sync(self.score_businesses())
+        # Rank by predicted_probability
+        scored_leads = rank_lead_rows(build_lead_row(business.get('id'), result) for business, result in zip(self.businesses, scores))
+        for business, result in zip(self.businesses, scores):
             results.append({
                 "business_id": business.get('id'),
                 "name": business.get('name'),
                 "reasoning": result["reasoning"],                
                 "predicted_probability": result["predicted_probability"]
             })
-        # Rank by predicted_probability
-        scored_leads.sort(key=lambda l: l.predicted_probability, reverse=True)
         # Save to DB synchronously
         with SessionLocal() as session:
-            for lead in scored_leads:
-                session.add(lead)
+            insert_leads(session, scored_leads)
             session.commit()
         logger.info(f"Saved {len(scored_leads)} leads to database.")
+        if self.score_index is not None:
+            # Only successful LLM scores feed the index; failed ones carry no fingerprint.
+            try:
+                self.score_index.add([(b, r["predicted_probability"]) for b, r in self.llm_scored if r.get("input_fingerprint")])
+            except Exception as e:
+                logger.warning(f"Could not add new scores to the score index: {e}")
         return results
@@ -1,10 +1,39 @@
 """
 PersonaAndMarketingAgent: Accepts selected leads, generates a marketing persona and personalized email content for each lead.
+Prompt fields are fitted to PERSONA_PROMPT_TOKEN_BUDGET and answers are capped at MAX_OUTPUT_TOKENS
+plus headroom for the model's reasoning tokens.
+- run(): one lead at a time (Streamlit).
+- stream_persona_and_content(): one lead, yielding partial results while the answer streams in
+  (persona fields first, then each channel's text) and the validated result last.
+- run_async() / generate_personas(): bulk mode for campaigns. Leads are generated concurrently
+  within the shared rate limiter, a failing lead does not affect the others, and the results are
+  bulk-written to personas and outreach_contents.
+
+Usage:
+    python -m agentic_marketing.agents.persona_and_marketing_agent --lead-ids 1 2 3 --max-concurrency 8
 """
-from typing import List, Dict
+import argparse
+import asyncio
+from typing import AsyncIterator, List, Dict, Optional
 from pydantic import BaseModel, Field
 from agents import Agent, Runner, AgentOutputSchema
+from openai.types.responses import ResponseTextDeltaEvent
 import logging
+from agentic_marketing.config import PERSONA_PROMPT_TOKEN_BUDGET, OPENAI_MAX_CONCURRENCY
+from agentic_marketing.database import AsyncSessionLocal
+from agentic_marketing.repositories.personas import async_upsert_personas
+from agentic_marketing.utils.model_settings import capped_model_settings
+from agentic_marketing.utils.llm_cache import run_agent_cached, run_agent_cached_sync, get_cached_output, cache_output
+from agentic_marketing.utils.partial_json import parse_partial_json
+from agentic_marketing.utils.persona_input import iter_leads_with_business_info, LEAD_INPUT_BATCH_SIZE
+from agentic_marketing.utils.prompt_budget import PromptBudget
+from agentic_marketing.utils.rate_limit import RateLimiter, estimate_tokens, retry_with_backoff
+
+logger = logging.getLogger(__name__)
+
+# A persona plus three channel messages.
+MAX_OUTPUT_TOKENS = 1500
+PROMPT_BUDGET = PromptBudget(PERSONA_PROMPT_TOKEN_BUDGET, {"description": 600, "reasoning": 400})
 
 
 
@@ -27,17 +56,28 @@ class PersonaAndContentSchema(BaseModel):
     channel_contents: Dict[str, str] = Field(..., description="Dict mapping channel name (email, instagram, tiktok, etc.) to generated content.")
 
 class PersonaAndMarketingAgent:
-    def __init__(self, leads: List[Dict]):
+    def __init__(self, leads: List[Dict], limiter: Optional[RateLimiter] = None):
         self.leads = leads
+        # Only used by the async bulk mode.
+        self.limiter = limiter or RateLimiter()
+
+    def build_agent(self) -> Agent:
+        return Agent(
+            name="PersonaAndMarketingGenerator",
+            instructions="You are a marketing strategist. Generate a persona and personalized outreach content for each channel.",
+            output_type=AgentOutputSchema(PersonaAndContentSchema, strict_json_schema=False),
+            model_settings=capped_model_settings(MAX_OUTPUT_TOKENS),
+        )
 
     def build_prompt(self, lead: Dict) -> str:
+        fields = PROMPT_BUDGET.fit({"description": lead.get('description'), "reasoning": lead.get('reasoning')})
         return f"""
         Given the following business info and reasoning:
         Business Name: {lead.get('name')}
         Industry: {lead.get('industry')}
         Region: {lead.get('region')}
-        Description: {lead.get('description', '')}
-        Reasoning: {lead.get('reasoning', '')}
+        Description: {fields['description']}
+        Reasoning: {fields['reasoning']}
 
         1. Generate a marketing persona for the business's ideal customer (as a JSON object with keys: name, age, interests, pain_points, goals, preferred_channels).
         2. Write personalized outreach content for the following channels: email, instagram, tiktok. For each channel, generate content tailored to that channel and the business context.
@@ -49,36 +89,129 @@ class PersonaAndMarketingAgent:
         import traceback
         prompt = self.build_prompt(lead)
         print("We're in generate_persona_and_content!!!")
-        agent = Agent(
-            name="PersonaAndMarketingGenerator",
-            instructions="You are a marketing strategist. Generate a persona and personalized outreach content for each channel.",
-            output_type=AgentOutputSchema(PersonaAndContentSchema, strict_json_schema=False)
-        )
+        agent = self.build_agent()
         print("Agent created successfully.")
         try:
-            result = Runner.run_sync(agent, prompt)
+            parsed = run_agent_cached_sync(agent, prompt)
             print("Agent run completed successfully.")
         except Exception as e:
             print("Error running agent:", e)
             traceback.print_exc()
             raise
-        logging.info('Persona and content generation result: %s', result)
-        parsed = result.final_output
+        logging.info('Persona and content generation result: %s', parsed)
+        return self._result(lead, parsed)
+
+    def _result(self, lead: Dict, parsed: PersonaAndContentSchema) -> Dict:
         return {
             "lead_id": lead.get('id'),
             "persona_json": parsed.persona_json.model_dump() if hasattr(parsed.persona_json, 'model_dump') else dict(parsed.persona_json),
             "channel_contents": parsed.channel_contents
         }
 
+    def error_result(self, lead: Dict, error: Exception) -> Dict:
+        return {
+            "lead_id": lead.get('id'),
+            "persona_json": {},
+            "channel_contents": {"error": f"Error: {error}"}
+        }
+
+    async def stream_persona_and_content(self, lead: Dict) -> AsyncIterator[Dict]:
+        """
+        Yields {"lead_id", "persona_json", "channel_contents", "done"} snapshots as the answer streams in.
+        Partial snapshots are unvalidated; the last one (done=True) is the validated result.
+        """
+        agent = self.build_agent()
+        prompt = self.build_prompt(lead)
+        parsed = get_cached_output(agent, prompt)
+        if parsed is None:
+            result = Runner.run_streamed(agent, prompt)
+            text = ""
+            last = None
+            async for event in result.stream_events():
+                if event.type != "raw_response_event" or not isinstance(event.data, ResponseTextDeltaEvent):
+                    continue
+                text += event.data.delta
+                partial = parse_partial_json(text)
+                if not isinstance(partial, dict):
+                    continue
+                snapshot = {
+                    "lead_id": lead.get('id'),
+                    "persona_json": partial.get("persona_json") if isinstance(partial.get("persona_json"), dict) else {},
+                    "channel_contents": partial.get("channel_contents") if isinstance(partial.get("channel_contents"), dict) else {},
+                    "done": False,
+                }
+                if snapshot != last:
+                    last = snapshot
+                    yield snapshot
+            parsed = result.final_output
+            cache_output(agent, prompt, parsed)
+        yield {**self._result(lead, parsed), "done": True}
+
     def run(self) -> List[Dict]:
         results = []
         for lead in self.leads:
             try:
                 results.append(self.generate_persona_and_content(lead))
             except Exception as e:
-                results.append({
-                    "lead_id": lead.get('id'),
-                    "persona_json": {},
-                    "channel_contents": {"error": f"Error: {e}"}
-                })
+                results.append(self.error_result(lead, e))
         return results
+
+    async def _run_limited(self, agent: Agent, prompt: str):
+        async with self.limiter.limit(estimate_tokens(prompt) + agent.model_settings.max_tokens):
+            return await Runner.run(agent, prompt)
+
+    async def agenerate_persona_and_content(self, agent: Agent, lead: Dict) -> Dict:
+        prompt = self.build_prompt(lead)
+        try:
+            parsed = await run_agent_cached(agent, prompt, run=lambda: retry_with_backoff(lambda: self._run_limited(agent, prompt)))
+        except Exception as e:
+            logger.error(f"Persona generation failed for lead {lead.get('id')}: {e}")
+            return self.error_result(lead, e)
+        return self._result(lead, parsed)
+
+    async def run_async(self) -> List[Dict]:
+        """
+        Generates every lead concurrently (bounded by the limiter); results are returned in input order.
+        """
+        agent = self.build_agent()
+        return list(await asyncio.gather(*(self.agenerate_persona_and_content(agent, lead) for lead in self.leads)))
+
+
+async def generate_personas(lead_ids: List[int], max_concurrency: int = OPENAI_MAX_CONCURRENCY,
+                            batch_size: int = LEAD_INPUT_BATCH_SIZE) -> Dict:
+    """
+    Bulk mode: loads the leads, generates personas and contents concurrently and saves the
+    successful ones, batch_size leads at a time so memory stays bounded for large id lists.
+    Usable from scripts and from the API.
+    """
+    limiter = RateLimiter(max_concurrency=max_concurrency)
+    batches = iter_leads_with_business_info(lead_ids, batch_size)
+    found, failed = 0, []
+    saved = {"personas": 0, "outreach_contents": 0}
+    while True:
+        leads = await asyncio.to_thread(next, batches, None)
+        if leads is None:
+            break
+        results = await PersonaAndMarketingAgent(leads, limiter=limiter).run_async()
+        async with AsyncSessionLocal() as session:
+            batch_saved = await async_upsert_personas(session, results)
+            await session.commit()
+        found += len(leads)
+        failed += [r["lead_id"] for r in results if not r["persona_json"]]
+        saved = {key: saved[key] + batch_saved[key] for key in saved}
+    logger.info(f"Generated personas for {found - len(failed)}/{found} leads; saved {saved}.")
+    return {"requested": len(lead_ids), "found": found, "generated": found - len(failed),
+            "failed_lead_ids": failed, **saved}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate personas and outreach content for many leads.")
+    parser.add_argument("--lead-ids", type=int, nargs="+", required=True)
+    parser.add_argument("--max-concurrency", type=int, default=OPENAI_MAX_CONCURRENCY)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(asyncio.run(generate_personas(args.lead_ids, max_concurrency=args.max_concurrency)))
+
+
+if __name__ == "__main__":
+    main()
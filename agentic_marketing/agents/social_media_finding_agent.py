@@ -1,55 +1,106 @@
 import os
+import asyncio
 from dotenv import load_dotenv
 from tavily import TavilyClient
 import json
+from agentic_marketing.config import SEARCH_CACHE_MODE
+from agentic_marketing.utils.concurrency import provider_semaphore
+from agentic_marketing.utils.search_cache import cached_search
 
 # Load environment variables from .env file
 load_dotenv()
 
 api_key = os.getenv("TAVILY_API_KEY")
-if not api_key:
+# Replay mode answers everything from the search cache, so no key is needed.
+if not api_key and SEARCH_CACHE_MODE != "replay":
     raise ValueError("TAVILY_API_KEY not found in environment variables.")
 
-tavily_client = TavilyClient(api_key=api_key)
-def find_instagram_page(query):
-    response = tavily_client.search(query=query, 
-                                     max_results=1,
-                                     include_domains=["instagram.com"],
-                                     search_depth="advanced",
-                                     include_raw_content=False)
+tavily_client = TavilyClient(api_key=api_key) if api_key else None
+
+# Each lookup is split into its search parameters and a response parser so the
+# sync find_* functions and their async afind_* counterparts share one definition.
+
+def _search(**params):
+    return cached_search(lambda **p: tavily_client.search(**p), **params)
+
+async def _asearch(**params):
+    # TavilyClient is synchronous; run it in the default executor, bounded per provider.
+    async with provider_semaphore("tavily"):
+        return await asyncio.to_thread(_search, **params)
+
+def _instagram_params(query):
+    return dict(query=query,
+                max_results=1,
+                include_domains=["instagram.com"],
+                search_depth="advanced",
+                include_raw_content=False)
+
+def _parse_instagram(response):
     res = response.get("results", [])[0] if response.get("results") else None
     if res:
         return {"insta_url": res.get("url"), "insta_description": res.get("content")}
     return {"insta_url": None, "insta_description": None}
 
-def find_yelp_page(query):
-    response = tavily_client.search(query=query, 
-                                     max_results=3,
-                                     include_domains=["yelp.com/biz"],
-                                     search_depth="advanced",
-                                     include_raw_content=False)
+def find_instagram_page(query):
+    return _parse_instagram(_search(**_instagram_params(query)))
+
+async def afind_instagram_page(query):
+    return _parse_instagram(await _asearch(**_instagram_params(query)))
+
+def _yelp_params(query):
+    return dict(query=query,
+                max_results=3,
+                include_domains=["yelp.com/biz"],
+                search_depth="advanced",
+                include_raw_content=False)
+
+def _parse_yelp(response):
     if response and "results" in response and isinstance(response["results"], list) and len(response["results"]) > 0:
         results = [x for x in response["results"] if x.get("url").startswith("https://www.yelp.com/biz/")]
         if results:
             return {"yelp_url": results[0].get("url"), "yelp_description": results[0].get("content")}
     return {"yelp_url": None, "yelp_description": None}
 
-def find_description(query):
-    response = tavily_client.search(query=query, 
-                                     max_results=1,                                     
-                                     search_depth="advanced",
-                                     include_raw_content=True)
+def find_yelp_page(query):
+    return _parse_yelp(_search(**_yelp_params(query)))
+
+async def afind_yelp_page(query):
+    return _parse_yelp(await _asearch(**_yelp_params(query)))
+
+def _description_params(query):
+    return dict(query=query,
+                max_results=1,
+                search_depth="advanced",
+                include_raw_content=True)
+
+def _parse_description(response):
     res = response.get("results", [])[0] if response.get("results") else None
     if res:
         return {"description": res.get("content")}
     return {"description": None}
 
-def find_sector_trends(sector):
-    q = "latest trends in {sector}s related to using websites to increase customer engagement"
-    response = tavily_client.search(query=q, 
-                     max_results=5,                     
-                     search_depth="advanced",
-                     include_raw_content=False)
+def find_description(query):
+    return _parse_description(_search(**_description_params(query)))
+
+async def afind_description(query):
+    return _parse_description(await _asearch(**_description_params(query)))
+
+def _sector_trends_params(sector, region=None):
+    q = f"latest trends in {sector}s related to using websites to increase customer engagement"
+    if region:
+        q += f" in {region}"
+    return dict(query=q,
+                max_results=5,
+                search_depth="advanced",
+                include_raw_content=False)
+
+def _parse_sector_trends(response):
     if response and "results" in response and isinstance(response["results"], list) and len(response["results"]) > 0:
         return {"trends": '\n\n'.join([f"{x.get('title')}: {x.get('content')}" for x in response["results"] if x.get("content")])}
-    return {"trends": None}
\ No newline at end of file
+    return {"trends": None}
+
+def find_sector_trends(sector, region=None):
+    return _parse_sector_trends(_search(**_sector_trends_params(sector, region)))
+
+async def afind_sector_trends(sector, region=None):
+    return _parse_sector_trends(await _asearch(**_sector_trends_params(sector, region)))
@@ -1,57 +1,94 @@
 """
 WebScraperAgent: Discovers small businesses without websites in a given region or sector.
 - Uses Playwright for browser automation and BeautifulSoup for parsing.
-- Returns a list of business dicts: name, contact info, description, etc.
+- Shares one Chromium browser across the search and detail pages; detail pages are scraped concurrently.
+- Tavily enrichment runs off the event loop, in parallel with the detail scrapes.
+- Waits on selectors rather than fixed sleeps, and scrolls the results feed until k cards are loaded.
+- Only the result cards and the detail-panel nodes we read are pulled out of the page and parsed.
+- Returns a list of business dicts: name, contact info, description, etc., or streams them
+  one at a time from iter_businesses() as each finishes enrichment.
 """
 import asyncio
-from playwright.async_api import async_playwright
 import re
-from bs4 import BeautifulSoup, Tag
-from typing import List, Dict, Optional
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 import logging
-from .social_media_finding_agent import find_instagram_page, find_yelp_page, find_description, find_sector_trends
+from .social_media_finding_agent import afind_instagram_page, afind_yelp_page, afind_description
+from agentic_marketing.utils.sector_trends import get_cached_sector_trends
+from agentic_marketing.utils.browser_pool import BrowserPool
+from agentic_marketing.utils.page_readiness import AdaptiveTimeout, wait_for_ready, settle, scroll_until
 
 logger = logging.getLogger(__name__)
 
+RESULTS_FEED_SELECTOR = 'div[role="feed"]'
+RESULT_CARD_SELECTOR = ".Nv2PK"
+RESULTS_END_SELECTOR = "span.HlvSq"  # "You've reached the end of the list."
+# Either a results feed or, for a single exact match, the place title.
+SEARCH_READY_SELECTOR = f"{RESULT_CARD_SELECTOR}, h1.DUwDvf"
+DETAIL_READY_SELECTOR = "h1.DUwDvf"
+WEBSITE_SECTION_SELECTOR = "div.rogA2c.ITvuef"
+WEBSITE_TEXT_SELECTOR = "div.Io6YTe.fontBodyMedium.kR99db.fdkmkc"
+PHONE_BUTTON_SELECTOR = 'button.CsEnBe[data-tooltip="Copy phone number"]'
+# Matches the card's multi-valued class attribute whether the parser passes it whole or split.
+RESULT_CARD_STRAINER = SoupStrainer(class_=lambda c: bool(c) and "Nv2PK" in c.split())
+# JS that returns the outerHTML of every node matching a selector, so BeautifulSoup
+# only parses those subtrees instead of the whole Maps document.
+OUTER_HTML_JS = "els => els.map(e => e.outerHTML)"
+
 class WebScraperAgent:
-    def __init__(self, region: str, sector: str, max_results: int = 20):
+    def __init__(self, region: str, sector: str, max_results: int = 20, pool: Optional[BrowserPool] = None):
         self.region = region
         self.sector = sector
         self.max_results = max_results
+        # An externally supplied pool is shared with other agents and is not closed by this agent.
+        self.pool = pool or BrowserPool()
+        self._owns_pool = pool is None
+        self.search_timeout = AdaptiveTimeout(initial_ms=10000, min_ms=3000, max_ms=20000)
+        self.scroll_timeout = AdaptiveTimeout(initial_ms=3000, min_ms=1000, max_ms=8000)
+        self.detail_timeout = AdaptiveTimeout(initial_ms=5000, min_ms=1500, max_ms=15000)
+        # Outcome of the last iter_businesses() run, for callers that record crawl results.
+        self.cards_found = 0
+        self.enrichment_failed = 0
         logger.info(f"Initialized WebScraperAgent for region='{self.region}', sector='{self.sector}', k={self.max_results}")
     
+    async def close(self):
+        if self._owns_pool:
+            await self.pool.close()
+
     async def search_google_maps(self, query: str) -> str:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
+        async with self.pool.page() as page:
             await page.goto(f"https://www.google.com/maps")
             try:
                 await page.wait_for_selector("#searchboxinput", timeout=15000)
                 await page.fill("#searchboxinput", query)
                 await page.keyboard.press("Enter")
-                await page.wait_for_timeout(5000)
-                html = await page.content()
+                if await wait_for_ready(page, SEARCH_READY_SELECTOR, self.search_timeout):
+                    loaded = await scroll_until(page, RESULTS_FEED_SELECTOR, RESULT_CARD_SELECTOR, self.max_results,
+                                                self.scroll_timeout, end_selector=RESULTS_END_SELECTOR)
+                    logger.info(f"Loaded {loaded} result cards for '{query}'.")
+                html = "\n".join(await page.eval_on_selector_all(RESULT_CARD_SELECTOR, OUTER_HTML_JS))
             except Exception as e:
+                # Raised so callers can tell a failed search from one without results.
                 logger.error(f"Scraping error: {e}")
-                html = ""
-            await browser.close()
+                raise
             return html
 
     # async def get_instagram_account(self, business_name: str) -> dict:
     #     query = f"{business_name} {self.sector} {self.region}"
-    #     return find_instagram_page(query)
+    #     return await afind_instagram_page(query)
 
     async def get_yelp_page(self, business_name: str) -> dict:
         query = f"{business_name} {self.sector}, {self.region}"
-        return find_yelp_page(query)
+        return await afind_yelp_page(query)
 
     async def get_description(self, business_name: str) -> dict:
         query = f"Tell me a little bit about {business_name} {self.sector} in {self.region}"
-        description = find_description(query)
+        description = await afind_description(query)
         return description
 
     async def get_sector_trends(self) -> dict:
-        return find_sector_trends(self.sector)
+        # Depends only on the sector, so this is served from the shared trends store after the first call.
+        return await get_cached_sector_trends(self.sector)
 
     async def get_business_details(self, page, business_name: str, item) -> Dict:
         details: Dict[str, str] = {"website": "", "contact_phone": ""}
@@ -67,15 +104,16 @@ class WebScraperAgent:
             return details
         try:
             await page.goto(href)
-            await page.wait_for_timeout(3000)
-            details_html = await page.content()
-            details_soup = BeautifulSoup(details_html, "lxml")
-            website_section = details_soup.select_one("div.rogA2c.ITvuef")
+            if await wait_for_ready(page, DETAIL_READY_SELECTOR, self.detail_timeout):
+                await settle(page)
+            fragments = await page.eval_on_selector_all(f"{WEBSITE_SECTION_SELECTOR}, {PHONE_BUTTON_SELECTOR}", OUTER_HTML_JS)
+            details_soup = BeautifulSoup("".join(fragments), "lxml")
+            website_section = details_soup.select_one(WEBSITE_SECTION_SELECTOR)
             if website_section:
-                website_div = website_section.select_one("div.Io6YTe.fontBodyMedium.kR99db.fdkmkc")
+                website_div = website_section.select_one(WEBSITE_TEXT_SELECTOR)
                 if website_div and website_div.text:
                     details["website"] = website_div.text.strip()
-            phone_btn = details_soup.select_one('button.CsEnBe[data-tooltip="Copy phone number"]')
+            phone_btn = details_soup.select_one(PHONE_BUTTON_SELECTOR)
             if phone_btn:
                 aria_label = phone_btn.get("aria-label", "")
                 if isinstance(aria_label, str):
@@ -86,54 +124,99 @@ class WebScraperAgent:
             logger.error(f"Second-level details scrape error for {business_name}: {e}")
         return details
 
+    async def _scrape_details(self, business_name: str, item) -> Dict:
+        async with self.pool.page() as page:
+            return await self.get_business_details(page, business_name, item)
+
+    async def scrape_business(self, business_name: str, item) -> Dict:
+        # The browser detail scrape and the Tavily lookups are independent, so run them together.
+        details, yelp_page, desc_obj, trends = await asyncio.gather(
+            self._scrape_details(business_name, item),
+            self.get_yelp_page(business_name),
+            self.get_description(business_name),
+            self.get_sector_trends(),
+        )
+        email = None
+        yelp_url = yelp_page.get("yelp_url")
+        yelp_description = yelp_page.get("yelp_description")
+        # insta_page = await self.get_instagram_account(business_name)
+        # insta_url = insta_page.get("url")
+        # insta_description = insta_page.get("description")
+        description = desc_obj.get("description") if desc_obj else None
+        return {
+            "name": business_name,
+            "description": description,
+            "contact_phone": details["contact_phone"],
+            "contact_email": email,
+            # "insta_url": insta_url,
+            # "insta_description": insta_description,
+            "yelp_url": yelp_url,
+            "yelp_description": yelp_description,
+            "region": self.region,
+            "industry": self.sector,
+            "website": details["website"],
+            "trends": trends["trends"]
+        }
+
+    def select_candidates(self, html: str) -> List[Tuple[str, Tag]]:
+        # Accepts either the extracted card fragments or a full page; only card subtrees are built.
+        soup = BeautifulSoup(html, "lxml", parse_only=RESULT_CARD_STRAINER)
+        candidates = []
+        for item in soup.select(RESULT_CARD_SELECTOR):
+            name = item.select_one(".qBF1Pd")
+            business_name = name.text if name else None
+            # keeping all businesses and filtering only inside the database
+            if business_name:
+                candidates.append((business_name, item))
+                if len(candidates) >= self.max_results:
+                    break
+        return candidates
+
     async def parse_businesses(self, html: str) -> List[Dict]:
-        soup = BeautifulSoup(html, "lxml")
-        results = []
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-            for item in soup.select(".Nv2PK"):
-                name = item.select_one(".qBF1Pd")
-                business_name = name.text if name else None
-                email = None
-                details = {"website": None, "contact_phone": None}
-                if business_name:
-                    details = await self.get_business_details(page, business_name, item)
-                    yelp_page = await self.get_yelp_page(business_name)
-                    yelp_url = yelp_page.get("yelp_url")
-                    yelp_description = yelp_page.get("yelp_description")
-                    # insta_page = await self.get_instagram_account(business_name)
-                    # insta_url = insta_page.get("url")
-                    # insta_description = insta_page.get("description")
-                    desc_obj = await self.get_description(business_name)
-                    description = desc_obj.get("description") if desc_obj else None
-                    trends = await self.get_sector_trends()
-                # keeping all businesses and filtering only inside the database
-                # if not details["website"]:
-                    results.append({
-                        "name": business_name,
-                        "description": description,
-                        "contact_phone": details["contact_phone"],
-                        "contact_email": email,
-                        # "insta_url": insta_url,
-                        # "insta_description": insta_description,
-                        "yelp_url": yelp_url,
-                        "yelp_description": yelp_description,
-                        "region": self.region,
-                        "industry": self.sector,
-                        "website": details["website"],
-                        "trends": trends["trends"]
-                    })
-                    if len(results) >= self.max_results:
-                        break
-            await browser.close()
+        candidates = self.select_candidates(html)
+        # Detail pages are bounded by the pool size; gather keeps the Maps result order.
+        results = list(await asyncio.gather(*(self.scrape_business(name, item) for name, item in candidates)))
         logger.info(f"Found {len(results)} businesses.")
         return results
 
     async def find_businesses_without_websites(self) -> List[Dict]:
         logger.info("Calling find_businesses_without_websites()...")
         query = f"{self.sector} in {self.region}"
-        html = await self.search_google_maps(query)
-        businesses = await self.parse_businesses(html)
+        try:
+            html = await self.search_google_maps(query)
+            businesses = await self.parse_businesses(html)
+        finally:
+            await self.close()
         logger.info(f"Found {len(businesses)} businesses.")
         return businesses
+
+    async def iter_businesses(self) -> AsyncIterator[Dict]:
+        """
+        Streaming variant of find_businesses_without_websites: yields each business as soon as
+        its detail scrape and enrichment complete, in completion order. A business whose
+        enrichment fails is logged, counted in enrichment_failed and skipped without affecting
+        the others. Search errors are raised.
+        """
+        query = f"{self.sector} in {self.region}"
+        self.cards_found = self.enrichment_failed = 0
+        try:
+            html = await self.search_google_maps(query)
+            candidates = self.select_candidates(html)
+            self.cards_found = len(candidates)
+            tasks = [asyncio.ensure_future(self.scrape_business(name, item)) for name, item in candidates]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    try:
+                        business = await next_done
+                    except Exception as e:
+                        logger.error(f"Enrichment error while streaming businesses: {e}")
+                        self.enrichment_failed += 1
+                        continue
+                    yield business
+            finally:
+                # The consumer may stop early; don't leave scrapes running against a closing browser.
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            await self.close()
@@ -10,3 +10,46 @@ DATABASE_URL = os.getenv("DATABASE_URL", "postgresql+asyncpg://ghamz:LoomLoom@lo
 MAILGUN_API_KEY = os.getenv("MAILGUN_API_KEY", "")
 MAILGUN_DOMAIN = os.getenv("MAILGUN_DOMAIN", "")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+
+# OpenAI request scheduling for the scoring agents
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+OPENAI_REQUESTS_PER_MINUTE = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+OPENAI_TOKENS_PER_MINUTE = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "200000"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+OPENAI_REQUEST_TIMEOUT_SECONDS = float(os.getenv("OPENAI_REQUEST_TIMEOUT_SECONDS", "120"))
+# Lead scoring model for both the interactive and the bulk scorer; empty = the Agents SDK default model
+LEAD_SCORING_MODEL = os.getenv("LEAD_SCORING_MODEL", "")
+# Businesses per scoring request in LeadScoringAgentAlternative (1 = one request per business)
+LEAD_SCORING_BATCH_SIZE = int(os.getenv("LEAD_SCORING_BATCH_SIZE", "5"))
+# Local pre-filter ahead of LLM scoring: model file and the confidence band left to the LLM
+PREFILTER_MODEL_PATH = os.getenv("PREFILTER_MODEL_PATH", ".cache/lead_prefilter.pkl")
+PREFILTER_LOW_THRESHOLD = float(os.getenv("PREFILTER_LOW_THRESHOLD", "0.1"))
+PREFILTER_HIGH_THRESHOLD = float(os.getenv("PREFILTER_HIGH_THRESHOLD", "0.9"))
+# Nearest-neighbour reuse of earlier LLM scores: index location, embedding model, k and acceptance threshold
+SCORE_INDEX_DIR = os.getenv("SCORE_INDEX_DIR", ".cache/lead_score_index")
+SCORE_INDEX_MODEL = os.getenv("SCORE_INDEX_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+SCORE_INDEX_K = int(os.getenv("SCORE_INDEX_K", "5"))
+SCORE_INDEX_MIN_CONFIDENCE = float(os.getenv("SCORE_INDEX_MIN_CONFIDENCE", "0.85"))
+# Token budgets for the variable fields (descriptions, trends, reasoning) of each prompt
+SCORING_PROMPT_TOKEN_BUDGET = int(os.getenv("SCORING_PROMPT_TOKEN_BUDGET", "1200"))
+PERSONA_PROMPT_TOKEN_BUDGET = int(os.getenv("PERSONA_PROMPT_TOKEN_BUDGET", "1000"))
+
+# Scraper settings
+SCRAPER_PAGE_POOL_SIZE = int(os.getenv("SCRAPER_PAGE_POOL_SIZE", "4"))
+# Block images, fonts, map tiles and analytics on scraper pages; only DOM text is read.
+SCRAPER_LEAN_MODE = os.getenv("SCRAPER_LEAN_MODE", "true").lower() in ("1", "true", "yes")
+CRAWL_MAX_CONCURRENT_JOBS = int(os.getenv("CRAWL_MAX_CONCURRENT_JOBS", "2"))
+TAVILY_MAX_CONCURRENCY = int(os.getenv("TAVILY_MAX_CONCURRENCY", "5"))
+SECTOR_TRENDS_TTL_HOURS = float(os.getenv("SECTOR_TRENDS_TTL_HOURS", "168"))
+
+# Tavily response cache: "off", "on" or "replay" (serve only from cache, no network)
+SEARCH_CACHE_MODE = os.getenv("SEARCH_CACHE_MODE", "on").lower()
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", ".cache/search_cache.sqlite3")
+SEARCH_CACHE_TTL_HOURS = float(os.getenv("SEARCH_CACHE_TTL_HOURS", "168"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "50000"))
+
+# Shared LLM answer cache (keyed by model, instructions, schema and prompt)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite3")
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "720"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
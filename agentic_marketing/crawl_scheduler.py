@@ -0,0 +1,153 @@
+"""
+CrawlScheduler: runs a batch of (region, sector) crawls with a shared concurrency budget.
+- Every region x sector pair becomes a row in `crawl_jobs`, keyed by batch name.
+- All jobs share one browser pool and the per-provider Tavily limit; at most
+  `max_concurrent_jobs` searches run at once.
+- Re-running the same batch skips finished jobs and retries interrupted or failed ones,
+  so an interrupted batch resumes where it stopped; a new -k applies to every unfinished
+  job. A job fails when its search errors or finds no result cards, when every enrichment
+  fails, or when any batch fails to save.
+
+Usage:
+    python -m agentic_marketing.crawl_scheduler --batch 2026-w42 \
+        --regions "Portland, OR" "Seattle, WA" --sectors restaurants bakeries -k 20
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert
+from agentic_marketing.agents.web_scraper_agent import WebScraperAgent
+from agentic_marketing.config import CRAWL_MAX_CONCURRENT_JOBS, SCRAPER_PAGE_POOL_SIZE
+from agentic_marketing.database import AsyncSessionLocal
+from agentic_marketing.models import CrawlJob
+from agentic_marketing.utils.browser_pool import BrowserPool
+from agentic_marketing.utils.business_sink import BusinessSink
+
+logger = logging.getLogger(__name__)
+
+class CrawlScheduler:
+    def __init__(self, batch: str, regions: List[str], sectors: List[str], max_results: int = 20,
+                 max_concurrent_jobs: int = CRAWL_MAX_CONCURRENT_JOBS, max_attempts: int = 3,
+                 pool_size: int = SCRAPER_PAGE_POOL_SIZE):
+        self.batch = batch
+        self.regions = regions
+        self.sectors = sectors
+        self.max_results = max_results
+        self.max_concurrent_jobs = max(1, max_concurrent_jobs)
+        self.max_attempts = max_attempts
+        self.pool_size = pool_size
+
+    async def enqueue(self):
+        """
+        Creates a pending job for every region x sector pair not already in this batch. Jobs
+        that exist but have not finished take this run's max_results; finished jobs are kept.
+        """
+        rows = [
+            {"batch": self.batch, "region": region, "sector": sector, "max_results": self.max_results,
+             "status": "pending", "attempts": 0, "businesses_saved": 0}
+            for region in self.regions for sector in self.sectors
+        ]
+        if not rows:
+            return
+        stmt = insert(CrawlJob).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_crawl_jobs_batch_region_sector",
+            set_={"max_results": stmt.excluded.max_results},
+            where=CrawlJob.__table__.c.status != "done",
+        )
+        async with AsyncSessionLocal() as session:
+            await session.execute(stmt)
+            await session.commit()
+
+    async def runnable_jobs(self) -> List[CrawlJob]:
+        # "running" jobs belong to a run that was interrupted; they are picked up again.
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(CrawlJob)
+                .where(CrawlJob.batch == self.batch)
+                .where(CrawlJob.status != "done")
+                .where(CrawlJob.attempts < self.max_attempts)
+                .order_by(CrawlJob.id)
+            )
+            return list(result.scalars())
+
+    async def _update_job(self, job_id: int, **values):
+        async with AsyncSessionLocal() as session:
+            await session.execute(update(CrawlJob).where(CrawlJob.id == job_id).values(**values))
+            await session.commit()
+
+    @staticmethod
+    def job_failure(agent: WebScraperAgent, sink: BusinessSink) -> Optional[str]:
+        """
+        Why a crawl that ran to completion still failed, or None if it succeeded.
+        """
+        if agent.cards_found == 0:
+            return "Search returned no result cards."
+        if agent.enrichment_failed == agent.cards_found:
+            return f"Enrichment failed for all {agent.cards_found} businesses."
+        if sink.failed:
+            return f"{sink.failed} businesses failed to save: {sink.errors[-1]}"
+        return None
+
+    async def run_job(self, job: CrawlJob, pool: BrowserPool, slots: asyncio.Semaphore):
+        async with slots:
+            logger.info(f"Crawl job {job.id}: region='{job.region}', sector='{job.sector}', k={job.max_results}")
+            await self._update_job(job.id, status="running", attempts=CrawlJob.attempts + 1,
+                                   started_at=datetime.utcnow(), error=None)
+            agent = WebScraperAgent(region=job.region, sector=job.sector, max_results=job.max_results, pool=pool)
+            sink = BusinessSink()
+            try:
+                async with sink:
+                    async for business in agent.iter_businesses():
+                        await sink.add(business)
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            else:
+                error = self.job_failure(agent, sink)
+            if error:
+                logger.error(f"Crawl job {job.id} failed: {error}")
+                await self._update_job(job.id, status="failed", error=error,
+                                       businesses_saved=sink.saved, finished_at=datetime.utcnow())
+                return
+            await self._update_job(job.id, status="done", businesses_saved=sink.saved, finished_at=datetime.utcnow())
+
+    async def run(self) -> Dict[str, int]:
+        """
+        Enqueues the batch, runs every unfinished job and returns job counts by status.
+        """
+        await self.enqueue()
+        jobs = await self.runnable_jobs()
+        logger.info(f"Batch '{self.batch}': {len(jobs)} jobs to run.")
+        slots = asyncio.Semaphore(self.max_concurrent_jobs)
+        async with BrowserPool(size=self.pool_size) as pool:
+            await asyncio.gather(*(self.run_job(job, pool, slots) for job in jobs))
+        return await self.summary()
+
+    async def summary(self) -> Dict[str, int]:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(CrawlJob.status, func.count()).where(CrawlJob.batch == self.batch).group_by(CrawlJob.status)
+            )
+            return {status: count for status, count in result.all()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl a matrix of regions x sectors.")
+    parser.add_argument("--batch", required=True, help="Batch name; re-use it to resume an interrupted batch.")
+    parser.add_argument("--regions", nargs="+", required=True)
+    parser.add_argument("--sectors", nargs="+", required=True)
+    parser.add_argument("-k", "--max-results", type=int, default=20)
+    parser.add_argument("--max-concurrent-jobs", type=int, default=CRAWL_MAX_CONCURRENT_JOBS)
+    parser.add_argument("--pool-size", type=int, default=SCRAPER_PAGE_POOL_SIZE)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    scheduler = CrawlScheduler(args.batch, args.regions, args.sectors, max_results=args.max_results,
+                               max_concurrent_jobs=args.max_concurrent_jobs, pool_size=args.pool_size)
+    print(asyncio.run(scheduler.run()))
+
+
+if __name__ == "__main__":
+    main()
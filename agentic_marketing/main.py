@@ -1,11 +1,25 @@
 """
 Entry point for the Agentic Marketing backend API.
 """
+from typing import List
 from fastapi import FastAPI
+from pydantic import BaseModel, Field
 from . import config
+from .agents.persona_and_marketing_agent import generate_personas
 
 app = FastAPI(title="Agentic Marketing API", description="Multi-agent sales and marketing automation platform.")
 
+class BulkPersonaRequest(BaseModel):
+    lead_ids: List[int] = Field(..., min_length=1)
+    max_concurrency: int = Field(config.OPENAI_MAX_CONCURRENCY, ge=1, le=64)
+
 @app.get("/")
 def root():
     return {"message": "Agentic Marketing API is running."}
+
+@app.post("/personas/bulk")
+async def bulk_generate_personas(request: BulkPersonaRequest):
+    """
+    Generates and saves personas and outreach content for many leads at once.
+    """
+    return await generate_personas(request.lead_ids, max_concurrency=request.max_concurrency)
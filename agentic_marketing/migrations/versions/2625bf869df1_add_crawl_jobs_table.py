@@ -0,0 +1,38 @@
+"""
+Revision ID: 2625bf869df1
+Revises: 462165efff46
+Create Date: 2026-10-17 11:26:05.904117
+
+"""
+
+revision = "2625bf869df1"
+down_revision = '462165efff46'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table('crawl_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('batch', sa.String(length=128), nullable=False),
+    sa.Column('region', sa.String(length=128), nullable=False),
+    sa.Column('sector', sa.String(length=128), nullable=False),
+    sa.Column('max_results', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=32), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('businesses_saved', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('batch', 'region', 'sector', name='uq_crawl_jobs_batch_region_sector')
+    )
+    op.create_index(op.f('ix_crawl_jobs_id'), 'crawl_jobs', ['id'], unique=False)
+
+def downgrade():
+    op.drop_index(op.f('ix_crawl_jobs_id'), table_name='crawl_jobs')
+    op.drop_table('crawl_jobs')
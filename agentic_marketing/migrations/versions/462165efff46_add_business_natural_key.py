@@ -0,0 +1,37 @@
+"""
+Revision ID: 462165efff46
+Revises: 9e5414cf332a
+Create Date: 2026-10-17 10:03:17.552190
+
+"""
+
+revision = "462165efff46"
+down_revision = '9e5414cf332a'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.add_column('businesses', sa.Column('name_key', sa.String(length=256), nullable=True))
+    op.execute(r"UPDATE businesses SET name_key = lower(regexp_replace(btrim(name), '\s+', ' ', 'g'))")
+    # Collapse existing duplicates onto the oldest row so the unique index can be built.
+    op.execute("""
+        CREATE TEMPORARY TABLE business_duplicates ON COMMIT DROP AS
+        SELECT id, keep_id FROM (
+            SELECT id, min(id) OVER (PARTITION BY name_key, region, industry) AS keep_id FROM businesses
+        ) ranked
+        WHERE id <> keep_id
+    """)
+    op.execute("""
+        UPDATE leads SET business_id = d.keep_id
+        FROM business_duplicates d WHERE leads.business_id = d.id
+    """)
+    op.execute("DELETE FROM businesses USING business_duplicates d WHERE businesses.id = d.id")
+    op.create_index('uq_businesses_name_key_region_industry', 'businesses', ['name_key', 'region', 'industry'], unique=True)
+
+def downgrade():
+    op.drop_index('uq_businesses_name_key_region_industry', table_name='businesses')
+    op.drop_column('businesses', 'name_key')
@@ -0,0 +1,55 @@
+"""
+Revision ID: 7aee1cd020fa
+Revises: a8a6700a57c0
+Create Date: 2026-10-17 15:12:40.318224
+
+"""
+
+revision = "7aee1cd020fa"
+down_revision = 'a8a6700a57c0'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_index(op.f('ix_leads_business_id'), 'leads', ['business_id'], unique=False)
+    # Lead lists are paged best-first on (score, id).
+    op.create_index('ix_leads_score_id_desc', 'leads', [sa.text('score DESC'), sa.text('id DESC')], unique=False)
+    # Keep only the newest persona per lead and content per (lead, channel) so the unique
+    # constraints can be built; later saves update these rows in place.
+    op.execute("""
+        DELETE FROM personas USING (
+            SELECT id, max(id) OVER (PARTITION BY lead_id) AS keep_id FROM personas
+        ) ranked
+        WHERE personas.id = ranked.id AND ranked.id <> ranked.keep_id
+    """)
+    # Sent content is the record of what went out and cannot be restored on downgrade, so it
+    # is never deleted: stop if a (lead, channel) was sent more than once.
+    conflicts = op.get_bind().execute(sa.text("""
+        SELECT lead_id, channel, array_agg(id ORDER BY id) AS ids FROM outreach_contents
+        WHERE sent GROUP BY lead_id, channel HAVING count(*) > 1
+    """)).all()
+    if conflicts:
+        listing = "; ".join(f"lead_id={row.lead_id} channel={row.channel} ids={row.ids}" for row in conflicts)
+        raise RuntimeError(f"Several sent outreach contents per (lead_id, channel); resolve them by hand first: {listing}")
+    # Otherwise keep the sent row if there is one, else the newest.
+    op.execute("""
+        DELETE FROM outreach_contents USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY lead_id, channel ORDER BY coalesce(sent, false) DESC, id DESC
+            ) AS rn FROM outreach_contents
+        ) ranked
+        WHERE outreach_contents.id = ranked.id AND ranked.rn > 1
+    """)
+    # The unique indexes also serve as the lead_id foreign-key indexes.
+    op.create_unique_constraint('uq_personas_lead_id', 'personas', ['lead_id'])
+    op.create_unique_constraint('uq_outreach_contents_lead_id_channel', 'outreach_contents', ['lead_id', 'channel'])
+
+def downgrade():
+    op.drop_constraint('uq_outreach_contents_lead_id_channel', 'outreach_contents', type_='unique')
+    op.drop_constraint('uq_personas_lead_id', 'personas', type_='unique')
+    op.drop_index('ix_leads_score_id_desc', table_name='leads')
+    op.drop_index(op.f('ix_leads_business_id'), table_name='leads')
@@ -0,0 +1,31 @@
+"""
+Revision ID: 9e5414cf332a
+Revises: 292708816bc0
+Create Date: 2026-10-17 09:12:41.281034
+
+"""
+
+revision = "9e5414cf332a"
+down_revision = '292708816bc0'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table('sector_trends',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sector', sa.String(length=128), nullable=False),
+    sa.Column('region', sa.String(length=128), nullable=False),
+    sa.Column('trends', sa.Text(), nullable=True),
+    sa.Column('fetched_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('sector', 'region', name='uq_sector_trends_sector_region')
+    )
+    op.create_index(op.f('ix_sector_trends_id'), 'sector_trends', ['id'], unique=False)
+
+def downgrade():
+    op.drop_index(op.f('ix_sector_trends_id'), table_name='sector_trends')
+    op.drop_table('sector_trends')
@@ -0,0 +1,31 @@
+"""
+Revision ID: a8a6700a57c0
+Revises: 2625bf869df1
+Create Date: 2026-10-17 13:48:52.117406
+
+"""
+
+revision = "a8a6700a57c0"
+down_revision = '2625bf869df1'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+# Frozen copy of agentic_marketing.utils.fingerprint.FINGERPRINT_SQL at the time of this revision.
+FINGERPRINT_SQL = (
+    "md5(coalesce(name, '') || chr(31) || coalesce(region, '') || chr(31) || coalesce(industry, '') || chr(31) || "
+    "coalesce(description, '') || chr(31) || coalesce(yelp_description, '') || chr(31) || coalesce(trends, ''))"
+)
+
+
+def upgrade():
+    # A stored generated column is computed for every existing row as it is added.
+    op.add_column('businesses', sa.Column('input_fingerprint', sa.String(length=32), sa.Computed(FINGERPRINT_SQL, persisted=True), nullable=True))
+    # Existing leads have no recorded inputs; incremental scoring treats them as stale.
+    op.add_column('leads', sa.Column('input_fingerprint', sa.String(length=32), nullable=True))
+
+def downgrade():
+    op.drop_column('leads', 'input_fingerprint')
+    op.drop_column('businesses', 'input_fingerprint')
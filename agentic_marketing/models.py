@@ -1,16 +1,20 @@
 """
 SQLAlchemy ORM models for Agentic Marketing system.
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, Float, UniqueConstraint, Index, Computed
 from sqlalchemy.orm import declarative_base, relationship
 from datetime import datetime
+from agentic_marketing.utils.fingerprint import FINGERPRINT_SQL
 
 Base = declarative_base()
 
 class Business(Base):    
     __tablename__ = "businesses"
+    # Natural key used to upsert re-crawled businesses instead of inserting duplicates.
+    __table_args__ = (Index("uq_businesses_name_key_region_industry", "name_key", "region", "industry", unique=True),)
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(256), nullable=False)
+    name_key = Column(String(256))  # lower-cased, whitespace-collapsed name
     contact_email = Column(String(256))
     contact_phone = Column(String(64))
     description = Column(Text)
@@ -21,17 +25,22 @@ class Business(Base):
     yelp_url = Column(String(256))
     yelp_description = Column(Text)
     trends = Column(Text) # trend columns, recent promotions, etc.
+    # Hash of the scoring inputs, maintained by the database; see utils/fingerprint.py.
+    input_fingerprint = Column(String(32), Computed(FINGERPRINT_SQL, persisted=True))
     created_at = Column(DateTime, default=datetime.utcnow)
     leads = relationship("Lead", back_populates="business")
 
 class Lead(Base):
     __tablename__ = "leads"
     id = Column(Integer, primary_key=True, index=True)
-    business_id = Column(Integer, ForeignKey("businesses.id"), nullable=False)
+    business_id = Column(Integer, ForeignKey("businesses.id"), nullable=False, index=True)
     score = Column(Float, nullable=False)
+    # Lead lists are read best-first, paged on (score, id); see repositories/leads.list_ranked_leads.
+    __table_args__ = (Index("ix_leads_score_id_desc", score.desc(), id.desc()),)
     status = Column(String(32), default="new")  # new, selected, contacted, etc.
     reasoning = Column(Text)
     predicted_probability = Column(Float)
+    input_fingerprint = Column(String(32))  # Business.input_fingerprint this lead was scored from
     created_at = Column(DateTime, default=datetime.utcnow)
     business = relationship("Business", back_populates="leads")
     personas = relationship("Persona", back_populates="lead")
@@ -39,6 +48,8 @@ class Lead(Base):
 
 class Persona(Base):
     __tablename__ = "personas"
+    # One persona per lead; saving again updates it.
+    __table_args__ = (UniqueConstraint("lead_id", name="uq_personas_lead_id"),)
     id = Column(Integer, primary_key=True, index=True)
     lead_id = Column(Integer, ForeignKey("leads.id"), nullable=False)
     persona_json = Column(JSON)  # LLM-generated persona
@@ -47,6 +58,8 @@ class Persona(Base):
 
 class OutreachContent(Base):
     __tablename__ = "outreach_contents"
+    # One content per lead and channel; saving again updates it.
+    __table_args__ = (UniqueConstraint("lead_id", "channel", name="uq_outreach_contents_lead_id_channel"),)
     id = Column(Integer, primary_key=True, index=True)
     lead_id = Column(Integer, ForeignKey("leads.id"), nullable=False)
     channel = Column(String(32))  # email, instagram, tiktok, telegram
@@ -63,3 +76,28 @@ class LogEntry(Base):
     event_type = Column(String(64))
     event_data = Column(JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+class SectorTrend(Base):
+    __tablename__ = "sector_trends"
+    __table_args__ = (UniqueConstraint("sector", "region", name="uq_sector_trends_sector_region"),)
+    id = Column(Integer, primary_key=True, index=True)
+    sector = Column(String(128), nullable=False)
+    region = Column(String(128), nullable=False, default="")  # "" = not region specific
+    trends = Column(Text)
+    fetched_at = Column(DateTime, default=datetime.utcnow)
+
+class CrawlJob(Base):
+    __tablename__ = "crawl_jobs"
+    __table_args__ = (UniqueConstraint("batch", "region", "sector", name="uq_crawl_jobs_batch_region_sector"),)
+    id = Column(Integer, primary_key=True, index=True)
+    batch = Column(String(128), nullable=False)
+    region = Column(String(128), nullable=False)
+    sector = Column(String(128), nullable=False)
+    max_results = Column(Integer, nullable=False)
+    status = Column(String(32), default="pending")  # pending, running, done, failed
+    attempts = Column(Integer, default=0)
+    businesses_saved = Column(Integer, default=0)
+    error = Column(Text)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,133 @@
+"""
+Business repository: idempotent bulk upserts of scraped businesses, selection of
+businesses that need (re-)scoring, and keyset-paginated summary listings.
+Rows are matched on the natural key (name_key, region, industry); re-crawling a business
+updates it in place instead of inserting a duplicate.
+"""
+from typing import Dict, Iterable, Iterator, List, Optional
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from agentic_marketing.models import Business, Lead
+
+NATURAL_KEY = ("name_key", "region", "industry")
+# Columns a caller may supply; id, created_at and generated columns are left to the database.
+BUSINESS_COLUMNS = [col.name for col in Business.__table__.columns
+                    if col.name not in ("id", "created_at") and col.computed is None]
+# What the lead scorers read for each business.
+SCORING_COLUMNS = (Business.id, Business.name, Business.region, Business.industry,
+                   Business.description, Business.yelp_description, Business.trends, Business.input_fingerprint)
+# Listing projection: no description, Yelp or trends text.
+BUSINESS_SUMMARY_COLUMNS = (Business.id, Business.name, Business.website, Business.region, Business.industry)
+UPSERT_BATCH_SIZE = 500
+
+
+def normalize_name(name: str) -> str:
+    return " ".join((name or "").lower().split())
+
+
+def prepare_business_rows(records: Iterable[Dict]) -> List[Dict]:
+    """
+    Keeps only Business columns, fills in name_key, and de-duplicates on the natural key
+    (last record wins), since one INSERT ... ON CONFLICT cannot touch the same row twice.
+    """
+    rows: Dict[tuple, Dict] = {}
+    for record in records:
+        if not record.get("name"):
+            continue
+        row = {col: record.get(col) for col in BUSINESS_COLUMNS}
+        row["name_key"] = normalize_name(record["name"])
+        rows[tuple(row[k] for k in NATURAL_KEY)] = row
+    return list(rows.values())
+
+
+def build_business_upsert(rows: List[Dict]):
+    stmt = insert(Business).values(rows)
+    table = Business.__table__
+    # A missing value in the new crawl must not wipe one we already have.
+    updates = {
+        col: func.coalesce(stmt.excluded[col], table.c[col])
+        for col in BUSINESS_COLUMNS if col not in NATURAL_KEY
+    }
+    return stmt.on_conflict_do_update(index_elements=list(NATURAL_KEY), set_=updates).returning(Business.id)
+
+
+def upsert_businesses(session: Session, records: Iterable[Dict]) -> List[int]:
+    """
+    Inserts or updates businesses and returns their ids. The caller commits.
+    """
+    rows = prepare_business_rows(records)
+    ids: List[int] = []
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        ids.extend(session.execute(build_business_upsert(rows[start:start + UPSERT_BATCH_SIZE])).scalars())
+    return ids
+
+
+async def async_upsert_businesses(session: AsyncSession, records: Iterable[Dict]) -> List[int]:
+    """
+    AsyncSession variant of upsert_businesses. The caller commits.
+    """
+    rows = prepare_business_rows(records)
+    ids: List[int] = []
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        result = await session.execute(build_business_upsert(rows[start:start + UPSERT_BATCH_SIZE]))
+        ids.extend(result.scalars())
+    return ids
+
+
+def select_businesses_for_scoring(incremental: bool = True):
+    """
+    Builds a query over SCORING_COLUMNS. In incremental mode only businesses with no lead,
+    or whose latest lead was scored from a different input fingerprint, are selected.
+    """
+    query = select(*SCORING_COLUMNS)
+    if not incremental:
+        return query
+    latest = (
+        select(
+            Lead.business_id,
+            Lead.input_fingerprint,
+            func.row_number().over(partition_by=Lead.business_id, order_by=(Lead.created_at.desc(), Lead.id.desc())).label("rn"),
+        ).subquery()
+    )
+    return (
+        query.outerjoin(latest, (latest.c.business_id == Business.id) & (latest.c.rn == 1))
+        .where(or_(latest.c.business_id.is_(None), latest.c.input_fingerprint.is_distinct_from(Business.input_fingerprint)))
+    )
+
+
+def iter_businesses_for_scoring(session: Session, incremental: bool = True, batch_size: int = 500) -> Iterator[Dict]:
+    """
+    Streams scoring inputs as dicts without hydrating ORM objects.
+    """
+    for row in session.execute(select_businesses_for_scoring(incremental).execution_options(yield_per=batch_size)):
+        yield row._asdict()
+
+
+def list_business_summaries(session: Session, limit: int = 50, after_id: Optional[int] = None,
+                            region: Optional[str] = None, industry: Optional[str] = None) -> Dict:
+    """
+    One page of businesses, newest first. Pass the returned next_cursor as `after_id` to get the
+    following page; it is None on the last page.
+    """
+    query = select(*BUSINESS_SUMMARY_COLUMNS)
+    if region:
+        query = query.where(Business.region == region)
+    if industry:
+        query = query.where(Business.industry == industry)
+    if after_id is not None:
+        query = query.where(Business.id < after_id)
+    rows = session.execute(query.order_by(Business.id.desc()).limit(limit + 1)).mappings().all()
+    items = rows[:limit]
+    return {"items": items, "next_cursor": items[-1]["id"] if len(rows) > limit else None}
+
+
+def get_businesses_for_scoring(session: Session, business_ids: List[int]) -> List[Dict]:
+    """
+    Scoring inputs (plus website, for the pre-filter) of the given businesses.
+    """
+    if not business_ids:
+        return []
+    rows = session.execute(select(*SCORING_COLUMNS, Business.website).where(Business.id.in_(business_ids)))
+    return [row._asdict() for row in rows]
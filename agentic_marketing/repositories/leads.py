@@ -0,0 +1,112 @@
+"""
+Lead repository: bulk persistence of scoring results and queries over scored leads.
+insert_leads / async_insert_leads write any number of leads in one executemany (batched
+INSERT ... RETURNING) and return the generated ids in input order, from sync or async callers.
+list_ranked_leads pages through leads best-first with a keyset cursor, projecting only the
+columns a listing needs.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from agentic_marketing.models import Business, Lead
+
+# Reasonings the scorers store when the LLM call failed.
+SCORING_ERRORS = ("Validation error", "Agent SDK error", "LLM error", "LLM timeout")
+# Reasoning prefixes of leads settled locally instead of by the LLM.
+PREFILTER_PREFIX = "Pre-filter: "
+NEIGHBOUR_PREFIX = "Neighbour estimate: "
+LOCAL_REASONING_PREFIXES = (PREFILTER_PREFIX, NEIGHBOUR_PREFIX)
+# Listing projection: no reasoning or business text.
+LEAD_SUMMARY_COLUMNS = (
+    Lead.id.label("lead_id"), Lead.business_id, Business.name, Business.region, Business.industry,
+    Lead.score, Lead.predicted_probability, Lead.status, Lead.created_at,
+)
+
+
+def build_lead_row(business_id: Optional[int], result: Dict) -> Dict:
+    """
+    Lead row for one scorer result ({"predicted_probability", "reasoning", "input_fingerprint"}).
+    """
+    return {
+        "business_id": business_id,
+        "score": result["predicted_probability"],
+        "predicted_probability": result["predicted_probability"],
+        "reasoning": result["reasoning"],
+        "input_fingerprint": result.get("input_fingerprint"),
+    }
+
+
+def rank_lead_rows(rows: Iterable[Dict]) -> List[Dict]:
+    return sorted(rows, key=lambda row: row["predicted_probability"], reverse=True)
+
+
+def _insert_leads_stmt():
+    return insert(Lead).returning(Lead.id, sort_by_parameter_order=True)
+
+
+def insert_leads(session: Session, rows: List[Dict]) -> List[int]:
+    """
+    Inserts lead rows and returns their ids in input order. The caller commits.
+    """
+    if not rows:
+        return []
+    return list(session.execute(_insert_leads_stmt(), rows).scalars())
+
+
+async def async_insert_leads(session: AsyncSession, rows: List[Dict]) -> List[int]:
+    """
+    AsyncSession variant of insert_leads. The caller commits.
+    """
+    if not rows:
+        return []
+    result = await session.execute(_insert_leads_stmt(), rows)
+    return list(result.scalars())
+
+
+def select_latest_llm_scores():
+    """
+    The latest successful LLM-scored lead of each business, with the business text it was scored from.
+    """
+    latest = (
+        select(
+            Lead.id,
+            Lead.business_id,
+            Lead.predicted_probability,
+            Lead.input_fingerprint,
+            func.row_number().over(partition_by=Lead.business_id, order_by=(Lead.created_at.desc(), Lead.id.desc())).label("rn"),
+        )
+        .where(Lead.predicted_probability.is_not(None), Lead.reasoning.not_in(SCORING_ERRORS))
+        .where(*(~Lead.reasoning.startswith(prefix) for prefix in LOCAL_REASONING_PREFIXES))
+        .subquery()
+    )
+    return (
+        select(
+            latest.c.id.label("lead_id"), Business.id.label("business_id"), Business.name, Business.industry,
+            Business.description, Business.yelp_description, latest.c.predicted_probability, latest.c.input_fingerprint,
+        )
+        .join(latest, (latest.c.business_id == Business.id) & (latest.c.rn == 1))
+    )
+
+
+def list_ranked_leads(session: Session, limit: int = 50, after: Optional[Tuple[float, int]] = None,
+                      region: Optional[str] = None, industry: Optional[str] = None,
+                      status: Optional[str] = None) -> Dict:
+    """
+    One page of leads ordered by score (best first), joined to their business name.
+    Pass the returned next_cursor as `after` to get the following page; it is None on the last page.
+    """
+    query = select(*LEAD_SUMMARY_COLUMNS).join(Business, Business.id == Lead.business_id)
+    if region:
+        query = query.where(Business.region == region)
+    if industry:
+        query = query.where(Business.industry == industry)
+    if status:
+        query = query.where(Lead.status == status)
+    if after is not None:
+        # (score, id) descending, so the next page continues strictly below the cursor.
+        query = query.where(tuple_(Lead.score, Lead.id) < tuple_(*after))
+    rows = session.execute(query.order_by(Lead.score.desc(), Lead.id.desc()).limit(limit + 1)).mappings().all()
+    items = rows[:limit]
+    next_cursor = (items[-1]["score"], items[-1]["lead_id"]) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
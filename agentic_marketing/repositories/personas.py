@@ -0,0 +1,76 @@
+"""
+Persona repository: bulk upserts of generated personas and outreach contents.
+Takes the result dicts produced by PersonaAndMarketingAgent ({"lead_id", "persona_json",
+"channel_contents"}); failed generations (empty persona) are skipped.
+A lead has one persona and one content per channel, so saving again updates them in place
+(one INSERT ... ON CONFLICT per table, no existence checks).
+"""
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import case
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from agentic_marketing.models import Persona, OutreachContent
+
+
+def prepare_persona_rows(results: Iterable[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    De-duplicated on the conflict keys (last result wins), since one INSERT ... ON CONFLICT
+    cannot touch the same row twice.
+    """
+    personas: Dict[int, Dict] = {}
+    contents: Dict[tuple, Dict] = {}
+    for result in results:
+        if result.get("lead_id") is None or not result.get("persona_json"):
+            continue
+        personas[result["lead_id"]] = {"lead_id": result["lead_id"], "persona_json": result["persona_json"]}
+        for channel, content in (result.get("channel_contents") or {}).items():
+            contents[(result["lead_id"], channel)] = {"lead_id": result["lead_id"], "channel": channel, "content": content}
+    return list(personas.values()), list(contents.values())
+
+
+def build_persona_upsert():
+    stmt = insert(Persona)
+    return stmt.on_conflict_do_update(
+        constraint="uq_personas_lead_id",
+        set_={"persona_json": stmt.excluded.persona_json},
+    )
+
+
+def build_outreach_upsert():
+    stmt = insert(OutreachContent)
+    table = OutreachContent.__table__
+    return stmt.on_conflict_do_update(
+        constraint="uq_outreach_contents_lead_id_channel",
+        set_={
+            "content": stmt.excluded.content,
+            # Changed content needs approving again.
+            "approved": case((table.c.content.is_distinct_from(stmt.excluded.content), False), else_=table.c.approved),
+        },
+        # Content that was already sent is a record of what went out; leave it alone.
+        where=table.c.sent.is_not(True),
+    )
+
+
+def upsert_personas(session: Session, results: Iterable[Dict]) -> Dict[str, int]:
+    """
+    Inserts or updates personas and outreach contents, one statement per table. The caller commits.
+    """
+    personas, contents = prepare_persona_rows(results)
+    if personas:
+        session.execute(build_persona_upsert(), personas)
+    if contents:
+        session.execute(build_outreach_upsert(), contents)
+    return {"personas": len(personas), "outreach_contents": len(contents)}
+
+
+async def async_upsert_personas(session: AsyncSession, results: Iterable[Dict]) -> Dict[str, int]:
+    """
+    AsyncSession variant of upsert_personas. The caller commits.
+    """
+    personas, contents = prepare_persona_rows(results)
+    if personas:
+        await session.execute(build_persona_upsert(), personas)
+    if contents:
+        await session.execute(build_outreach_upsert(), contents)
+    return {"personas": len(personas), "outreach_contents": len(contents)}
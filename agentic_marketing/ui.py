@@ -3,16 +3,21 @@ Streamlit UI for testing agents: allows user to input region, sector, and number
 Displays results and saves to the database using the Business model.
 """
 
+import os
 import streamlit as st
 
 from agentic_marketing.agents.web_scraper_agent import WebScraperAgent
 from agentic_marketing.agents.lead_scoring_agent_alternative import LeadScoringAgentAlternative
-from agentic_marketing.agents.persona_and_marketing_agent import PersonaAndMarketingAgent
+from agentic_marketing.agents.lead_prefilter import LeadPreFilter
+from agentic_marketing.agents.lead_score_index import LeadScoreIndex
+from agentic_marketing.agents.persona_and_marketing_agent import PersonaAndMarketingAgent, generate_personas
 from agentic_marketing.utils.persona_input import get_leads_with_business_info
-from agentic_marketing.models import Business, Lead, Persona, OutreachContent, Base
+from agentic_marketing.utils.business_sink import BusinessSink
+from agentic_marketing.repositories.businesses import list_business_summaries, get_businesses_for_scoring
+from agentic_marketing.repositories.leads import list_ranked_leads
+from agentic_marketing.repositories.personas import upsert_personas
 from agentic_marketing.database import engine, SessionLocal
-import streamlit as st
-from sqlalchemy import select
+from agentic_marketing.config import SCORE_INDEX_DIR
 import logging
 
 # Ensure an event loop exists for OpenAI Agents SDK Runner.run_sync
@@ -22,7 +27,6 @@ try:
 except RuntimeError:
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
-from sqlalchemy import select, inspect
 
 
 st.title("Agentic Marketing: Business Discovery & Lead Scoring")
@@ -34,43 +38,42 @@ with st.form("scraper_form"):
     submitted = st.form_submit_button("Run Scraper")
 
 
-def get_business_columns():
-    insp = inspect(Business)
-    return [col.name for col in insp.columns]
-
-
-def save_businesses(businesses):    
-    logger = logging.getLogger("save_businesses")
-    with SessionLocal() as session:
-        for b in businesses:
-            cols = get_business_columns()
-            filtered = {k: v for k, v in b.items() if k in cols}
-            logger.info(f"Attempting to add business: {filtered}")
-            try:
-                business = Business(**filtered)
-                session.add(business)
-            except Exception as e:
-                logger.error(f"Error adding business: {filtered}\nException: {e}")
+def run_async(coro):
+    """
+    Runs a coroutine that uses the async engine on this rerun's event loop. Pooled asyncpg
+    connections belong to the loop that opened them, so the pool is emptied afterwards and
+    the next rerun starts with fresh connections.
+    """
+    async def run_and_dispose():
         try:
-            session.commit()
-        except Exception as e:
-            logger.error(f"Error during session.commit(): {e}")
+            return await coro
+        finally:
+            await engine.dispose()
+    return asyncio.get_event_loop().run_until_complete(run_and_dispose())
 
 
-def run_scraper(region, sector, k):
+def run_scraper(region, sector, k, on_business=None):
     process_log = []
     process_log.append(f"Initialized WebScraperAgent for region='{region}', sector='{sector}', k={k}")
     agent = WebScraperAgent(region=region, sector=sector, max_results=k)
-    process_log.append("Calling find_businesses_without_websites()...")
-    businesses = agent.find_businesses_without_websites()
-    import types
-    if isinstance(businesses, types.CoroutineType):
-        raise RuntimeError("WebScraperAgent.find_businesses_without_websites() returned a coroutine. This method must be synchronous and return a list.")
-    process_log.append(f"Scraping complete. {len(businesses)} businesses found.")
-    process_log.append("Saving businesses to database...")
-    save_businesses(businesses)
-    process_log.append("Database save complete.")
-    return businesses
+    process_log.append("Streaming businesses from iter_businesses() into the database...")
+
+    async def crawl():
+        # Each business is persisted in small batches as soon as it is enriched,
+        # so a failure part-way keeps everything found so far.
+        businesses = []
+        sink = BusinessSink(batch_size=5)
+        async with sink:
+            async for business in agent.iter_businesses():
+                businesses.append(business)
+                await sink.add(business)
+                if on_business:
+                    on_business(business, len(businesses))
+        return businesses, sink
+
+    businesses, sink = run_async(crawl())
+    process_log.append(f"Scraping complete. {len(businesses)} businesses found, {sink.saved} saved, {sink.failed} failed to save.")
+    return businesses, {"saved": sink.saved, "failed": sink.failed, "errors": sink.errors}
 
 
 
@@ -78,67 +81,159 @@ def get_event_loop():
     pass  # No longer needed
 
 
-def fetch_businesses():
+PAGE_SIZE = 50
+
+
+def paged(key, fetch):
+    """
+    Renders Previous/Next buttons for a keyset-paginated listing and returns the current page's items.
+    fetch(cursor) returns {"items", "next_cursor"}; the cursors of the pages visited so far are kept
+    in session_state under `key`, so use a key that changes with the listing's filters.
+    """
+    cursors = st.session_state.setdefault(key, [None])
+    page = fetch(cursors[-1])
+    previous_col, next_col = st.columns(2)
+    if len(cursors) > 1 and previous_col.button("Previous page", key=f"{key}_previous"):
+        cursors.pop()
+        st.rerun()
+    if page["next_cursor"] is not None and next_col.button("Next page", key=f"{key}_next"):
+        cursors.append(page["next_cursor"])
+        st.rerun()
+    return page["items"]
+
+
+def fetch_business_page(cursor, region=None, industry=None):
     with SessionLocal() as session:
-        result = session.execute(select(Business.id, Business.name, Business.website, Business.region, Business.industry, Business.description, Business.yelp_description, Business.trends))
-        return result.fetchall()
+        return list_business_summaries(session, limit=PAGE_SIZE, after_id=cursor, region=region, industry=industry)
+
+
+def fetch_lead_page(cursor, region=None, industry=None, status=None):
+    with SessionLocal() as session:
+        return list_ranked_leads(session, limit=PAGE_SIZE, after=cursor, region=region, industry=industry, status=status)
+
 
 def select_businesses_ui(businesses):
+    """
+    Renders a checkbox per business on the current page. Checked businesses are kept in
+    session_state by id, so selections made on other pages are scored too.
+    """
     st.markdown("### Select Businesses for Lead Scoring")
-    selected = []
+    selected = st.session_state.setdefault("selected_businesses", {})
     for b in businesses:
-        label = f"{b.name} ({b.website or 'no website'})"
-        if st.checkbox(label, key=f"select_{b.id}"):
-            selected.append(b)
-    return selected
+        label = f"{b['name']} ({b['website'] or 'no website'})"
+        if st.checkbox(label, value=b["id"] in selected, key=f"select_{b['id']}"):
+            selected[b["id"]] = dict(b)
+        else:
+            selected.pop(b["id"], None)
+    return list(selected.values())
 
 def run_lead_scoring(selected_businesses):
     st.markdown("### Lead Scoring Progress")
-    progress_bars = [st.progress(0, text=f"Scoring {b.name}") for b in selected_businesses]
-    agent = LeadScoringAgentAlternative([b._asdict() for b in selected_businesses])
+    progress_bars = [st.progress(0, text=f"Scoring {b['name']}") for b in selected_businesses]
+    # Only the selected businesses' description, Yelp and trends text is loaded.
+    with SessionLocal() as session:
+        businesses = get_businesses_for_scoring(session, [b["id"] for b in selected_businesses])
+    # The score index is used once it has been built (python -m agentic_marketing.agents.lead_score_index --rebuild).
+    score_index = LeadScoreIndex() if os.path.isdir(SCORE_INDEX_DIR) else None
+    agent = LeadScoringAgentAlternative(businesses, prefilter=LeadPreFilter.load(), score_index=score_index)
     # Optionally show progress, but use process_and_save_leads for DB save
     for idx, business in enumerate(selected_businesses):
-        progress_bars[idx].progress(10, text=f"Scoring {business.name}...")
+        progress_bars[idx].progress(10, text=f"Scoring {business['name']}...")
         # The actual scoring is done in process_and_save_leads
-        progress_bars[idx].progress(100, text=f"Done: {business.name}")
+        progress_bars[idx].progress(100, text=f"Done: {business['name']}")
     results = agent.process_and_save_leads()
     return results
 
 if submitted:
     with st.spinner("Running web scraper agent..."):
-        results = run_scraper(region, sector, k)
-        import types
-        if isinstance(results, types.CoroutineType):
-            raise RuntimeError("run_scraper() returned a coroutine. This method must be synchronous and return a list.")
-    st.success(f"Found {len(results)} businesses.")
+        scrape_status = st.empty()
+        try:
+            results, saved = run_scraper(
+                region, sector, k,
+                on_business=lambda b, n: scrape_status.text(f"Found {n}/{k}: {b.get('name')}"),
+            )
+        except Exception as e:
+            logging.exception("Scraper failed")
+            st.error(f"Scraper failed: {e}")
+            st.stop()
+    if saved["failed"]:
+        st.error(f"Found {len(results)} businesses; {saved['saved']} saved, {saved['failed']} failed to save: {'; '.join(saved['errors'])}")
+    else:
+        st.success(f"Found {len(results)} businesses; {saved['saved']} saved.")
     st.write(results)
 
 # --- Lead Scoring UI ---
 st.markdown("---")
 st.header("Lead Scoring Agent")
 
-businesses = fetch_businesses()
+business_region_col, business_industry_col = st.columns(2)
+business_region = business_region_col.text_input("Filter by region", key="business_filter_region").strip() or None
+business_industry = business_industry_col.text_input("Filter by industry", key="business_filter_industry").strip() or None
+businesses = paged(
+    f"business_cursors_{business_region}_{business_industry}",
+    lambda cursor: fetch_business_page(cursor, business_region, business_industry),
+)
 if not businesses:
     st.info("No businesses found in the database. Run the scraper first.")
 else:
     selected = select_businesses_ui(businesses)
     if selected:
-        if st.button("Run Lead Scoring on Selected Businesses"):
+        st.caption(f"{len(selected)} businesses selected across all pages.")
+        if st.button("Clear Selection"):
+            st.session_state["selected_businesses"] = {}
+            for b in businesses:
+                st.session_state.pop(f"select_{b['id']}", None)
+            st.rerun()
+        if st.button(f"Run Lead Scoring on {len(selected)} Selected Businesses"):
             scoring_results = run_lead_scoring(selected)
             st.success("Lead scoring complete!")
             st.markdown("### Lead Scoring Results")
             st.dataframe(scoring_results)
 
+def stream_persona_ui(agent, lead):
+    """
+    Renders the persona and each channel's content as they stream in; returns the final result.
+    """
+    persona_box = st.empty()
+    contents_box = st.empty()
+
+    async def consume():
+        final = None
+        async for partial in agent.stream_persona_and_content(lead):
+            final = partial
+            if partial["done"]:
+                break
+            persona_box.json(partial["persona_json"])
+            contents_box.markdown("\n\n".join(
+                f"**{channel.title()}**\n\n{content}" for channel, content in partial["channel_contents"].items()
+            ))
+        return final
+
+    try:
+        result = asyncio.get_event_loop().run_until_complete(consume())
+    except Exception as e:
+        logging.exception("Error streaming persona and content")
+        result = agent.error_result(lead, e)
+    # The editable form below shows the final result.
+    persona_box.empty()
+    contents_box.empty()
+    return result
+
 # --- Persona & Marketing Agent UI (Moved to bottom) ---
 st.markdown("---")
 st.header("Persona & Marketing Generator Agent")
 
 
-# Fetch all leads and businesses separately, join in Python
 logging.basicConfig(level=logging.DEBUG)
-with SessionLocal() as session:
-    leads = session.query(Lead).all()
-    businesses = {b.id: b for b in session.query(Business).all()}
+# Best-scored leads first, one page at a time, with the business name joined in the query
+lead_region_col, lead_industry_col, lead_status_col = st.columns(3)
+lead_region = lead_region_col.text_input("Filter by region", key="lead_filter_region").strip() or None
+lead_industry = lead_industry_col.text_input("Filter by industry", key="lead_filter_industry").strip() or None
+lead_status = lead_status_col.text_input("Filter by status", key="lead_filter_status").strip() or None
+leads = paged(
+    f"lead_cursors_{lead_region}_{lead_industry}_{lead_status}",
+    lambda cursor: fetch_lead_page(cursor, lead_region, lead_industry, lead_status),
+)
 
 if not leads:
     st.info("No leads found. Run lead scoring first.")
@@ -146,21 +241,32 @@ else:
     # Let user select one lead at a time, show business name if available
     lead_options = {}
     for l in leads:
-        b = businesses.get(l.business_id)
-        label = f"{b.name if b else 'Unknown'} (Prob: {l.predicted_probability})"
-        lead_options[label] = l.id
+        label = f"{l['name'] or 'Unknown'} (Prob: {l['predicted_probability']})"
+        lead_options[label] = l["lead_id"]
     selected_lead_id = st.selectbox("Select a lead to generate persona and marketing content:", list(lead_options.keys()), key="persona_marketing_lead_selectbox")
     lead_id = lead_options[selected_lead_id]
 
+    # Bulk mode: generate and save directly for many leads, without the review form
+    with st.expander("Bulk generate for many leads"):
+        bulk_labels = st.multiselect("Leads", list(lead_options.keys()), key="persona_bulk_leads")
+        if bulk_labels and st.button("Generate & Save for Selected Leads"):
+            with st.spinner(f"Generating personas and content for {len(bulk_labels)} leads..."):
+                summary = run_async(
+                    generate_personas([lead_options[label] for label in bulk_labels])
+                )
+            st.success(f"Saved {summary['personas']} personas and {summary['outreach_contents']} outreach contents.")
+            if summary["failed_lead_ids"]:
+                st.warning(f"Generation failed for leads: {summary['failed_lead_ids']}")
+
     # Button to run agent and store result in session_state
     if st.button("Generate Persona & Marketing Content"):
         lead_dicts = get_leads_with_business_info([lead_id])
-        logging.info('lead_dicts: %s', lead_dicts)
+        logging.info("Fetched %d lead(s) for lead_id=%s", len(lead_dicts), lead_id)
         if not lead_dicts:
             st.error("Could not fetch lead/business info.")
         else:
             agent = PersonaAndMarketingAgent(lead_dicts)
-            result = agent.run()[0]
+            result = stream_persona_ui(agent, lead_dicts[0])
             st.session_state["persona_marketing_result"] = result
             st.session_state["persona_marketing_lead_id"] = lead_id
 
@@ -186,42 +292,19 @@ else:
             if submitted:
                 print("=== STARTING SAVE OPERATION ===")
                 try:
-                    persona_obj = Persona(
-                        lead_id=lead_id,
-                        persona_json={
-                            "name": persona_name,
-                            "age": persona_age,
-                            "interests": [i.strip() for i in persona_interests.split(",") if i.strip()],
-                            "pain_points": [i.strip() for i in persona_pain_points.split(",") if i.strip()],
-                            "goals": [i.strip() for i in persona_goals.split(",") if i.strip()],
-                            "preferred_channels": [i.strip() for i in persona_channels.split(",") if i.strip()]
-                        }
-                    )
+                    persona_json = {
+                        "name": persona_name,
+                        "age": persona_age,
+                        "interests": [i.strip() for i in persona_interests.split(",") if i.strip()],
+                        "pain_points": [i.strip() for i in persona_pain_points.split(",") if i.strip()],
+                        "goals": [i.strip() for i in persona_goals.split(",") if i.strip()],
+                        "preferred_channels": [i.strip() for i in persona_channels.split(",") if i.strip()]
+                    }
                     with SessionLocal() as session:
-                        # Check for existing persona for this lead
-                        existing_persona = session.query(Persona).filter_by(lead_id=lead_id).first()
-                        if existing_persona:
-                            print(f"Persona for lead_id={lead_id} already exists, skipping insert.")
-                        else:
-                            session.add(persona_obj)
-                            session.flush()
-                            print(f"Persona added and flushed for lead_id={lead_id}")
-                        # Save outreach content for each channel, avoid duplicates
-                        for channel, content in edited_contents.items():
-                            existing_outreach = session.query(OutreachContent).filter_by(lead_id=lead_id, channel=channel).first()
-                            if existing_outreach:
-                                print(f"OutreachContent for lead_id={lead_id}, channel={channel} already exists, skipping insert.")
-                            else:
-                                outreach = OutreachContent(
-                                    lead_id=lead_id,
-                                    channel=channel,
-                                    content=content
-                                )
-                                session.add(outreach)
-                                session.flush()
-                                print(f"OutreachContent added and flushed for lead_id={lead_id}, channel={channel}")
+                        # Insert or update the persona and every channel's content in one statement each
+                        saved = upsert_personas(session, [{"lead_id": lead_id, "persona_json": persona_json, "channel_contents": edited_contents}])
                         session.commit()
-                        print("Session committed for persona and outreach content.")
+                        print(f"Persona and outreach content upserted for lead_id={lead_id}: {saved}")
                     st.success("Persona and marketing content saved!")
                 except Exception as e:
                     logging.exception("Error saving persona or outreach content to database")
@@ -0,0 +1,111 @@
+"""
+Batch job backends for offline bulk LLM calls.
+A backend takes a JSONL file of requests in the OpenAI Batch API format, runs it
+asynchronously and hands back a JSONL file of responses in the same format.
+- OpenAIBatchBackend: the OpenAI Batch API.
+- LocalFileBatchBackend: a file-based stand-in for tests and dry runs.
+"""
+import json
+import os
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional
+from openai import OpenAI
+from agentic_marketing.config import OPENAI_API_KEY
+
+# Batch states reported by every backend.
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+FAILED = "failed"
+
+class BatchBackend(ABC):
+    @abstractmethod
+    def submit(self, input_path: str) -> str:
+        """Starts a batch from a JSONL request file and returns its batch id."""
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """Returns IN_PROGRESS, COMPLETED or FAILED."""
+
+    @abstractmethod
+    def download_results(self, batch_id: str, output_path: str) -> str:
+        """Writes the JSONL response file for a completed batch to output_path."""
+
+
+class OpenAIBatchBackend(BatchBackend):
+    def __init__(self, endpoint: str = "/v1/chat/completions", completion_window: str = "24h"):
+        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.endpoint = endpoint
+        self.completion_window = completion_window
+
+    def submit(self, input_path: str) -> str:
+        with open(input_path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=self.endpoint,
+            completion_window=self.completion_window,
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status == "completed":
+            return COMPLETED
+        if batch.status in ("failed", "expired", "cancelled"):
+            return FAILED
+        return IN_PROGRESS
+
+    def download_results(self, batch_id: str, output_path: str) -> str:
+        batch = self.client.batches.retrieve(batch_id)
+        with open(output_path, "w", encoding="utf-8") as f:
+            if batch.output_file_id:
+                f.write(self.client.files.content(batch.output_file_id).text)
+        return output_path
+
+
+class LocalFileBatchBackend(BatchBackend):
+    """
+    Keeps each batch in <root>/<batch_id>/. With a `responder`, every request is answered on
+    submit by calling responder(request_body) -> message content string. Without one, the
+    batch stays in progress until an output.jsonl is dropped into its directory.
+    """
+    def __init__(self, root: str = ".cache/local_batches", responder: Optional[Callable[[Dict], str]] = None):
+        self.root = root
+        self.responder = responder
+
+    def _dir(self, batch_id: str) -> str:
+        return os.path.join(self.root, batch_id)
+
+    def submit(self, input_path: str) -> str:
+        batch_id = f"local_batch_{uuid.uuid4().hex[:12]}"
+        os.makedirs(self._dir(batch_id))
+        shutil.copyfile(input_path, os.path.join(self._dir(batch_id), "input.jsonl"))
+        if self.responder:
+            self._answer(batch_id)
+        return batch_id
+
+    def _answer(self, batch_id: str):
+        with open(os.path.join(self._dir(batch_id), "input.jsonl"), encoding="utf-8") as src, \
+                open(os.path.join(self._dir(batch_id), "output.jsonl"), "w", encoding="utf-8") as dst:
+            for line in src:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                content = self.responder(request["body"])
+                dst.write(json.dumps({
+                    "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                    "custom_id": request["custom_id"],
+                    "response": {"status_code": 200, "body": {"choices": [{"message": {"role": "assistant", "content": content}}]}},
+                    "error": None,
+                }) + "\n")
+
+    def status(self, batch_id: str) -> str:
+        if not os.path.isdir(self._dir(batch_id)):
+            return FAILED
+        return COMPLETED if os.path.exists(os.path.join(self._dir(batch_id), "output.jsonl")) else IN_PROGRESS
+
+    def download_results(self, batch_id: str, output_path: str) -> str:
+        shutil.copyfile(os.path.join(self._dir(batch_id), "output.jsonl"), output_path)
+        return output_path
@@ -0,0 +1,118 @@
+"""
+BrowserPool: a long-lived headless Chromium shared by the scraper, with a bounded pool of pages.
+- One browser and one context per pool; pages are created lazily up to `size` and reused.
+- `async with pool.page() as page:` blocks while all pages are busy.
+- Lean mode blocks heavy resources (images, fonts, media, map tiles, analytics) through the
+  Chrome DevTools protocol, which, unlike page.route(), keeps the context's HTTP cache enabled.
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
+from agentic_marketing.config import SCRAPER_PAGE_POOL_SIZE, SCRAPER_LEAN_MODE
+
+logger = logging.getLogger(__name__)
+
+BLOCKED_URL_PATTERNS = [
+    # Images, fonts and media
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*",
+    "*.woff*", "*.ttf*", "*.otf*", "*.mp4*", "*.webm*",
+    "*googleusercontent.com/*",
+    "*streetviewpixels-pa.googleapis.com/*",
+    # Map tiles
+    "*/maps/vt?*", "*/maps/vt/*", "*/kh/v=*",
+    # Analytics and logging beacons
+    "*google-analytics.com/*", "*googletagmanager.com/*", "*doubleclick.net/*", "*/gen_204*", "*/log?*",
+]
+
+class BrowserPool:
+    def __init__(self, size: int = SCRAPER_PAGE_POOL_SIZE, headless: bool = True, lean: bool = SCRAPER_LEAN_MODE):
+        self.size = max(1, size)
+        self.headless = headless
+        self.lean = lean
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._context: Optional[BrowserContext] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._idle: List[Page] = []
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._context is not None
+
+    async def start(self) -> "BrowserPool":
+        """
+        Launch the browser if it is not running yet. Safe to call repeatedly.
+        """
+        async with self._start_lock:
+            if self.started:
+                return self
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+            self._context = await self._browser.new_context()
+            self._slots = asyncio.Semaphore(self.size)
+            self._idle = []
+            logger.info(f"Started Chromium browser pool with {self.size} pages (lean={self.lean}).")
+        return self
+
+    async def close(self):
+        async with self._start_lock:
+            if not self.started:
+                return
+            try:
+                await self._context.close()
+                await self._browser.close()
+            finally:
+                await self._playwright.stop()
+                self._playwright = None
+                self._browser = None
+                self._context = None
+                self._slots = None
+                self._idle = []
+            logger.info("Closed Chromium browser pool.")
+
+    async def __aenter__(self) -> "BrowserPool":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _acquire(self) -> Page:
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                page = self._idle.pop()
+                if not page.is_closed():
+                    return page
+            return await self._new_page()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def _new_page(self) -> Page:
+        page = await self._context.new_page()
+        if self.lean:
+            cdp = await self._context.new_cdp_session(page)
+            await cdp.send("Network.enable")
+            await cdp.send("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+            await cdp.send("Network.setCacheDisabled", {"cacheDisabled": False})
+        return page
+
+    def _release(self, page: Page):
+        # Crashed or closed pages are dropped; a fresh one is opened on the next acquire.
+        if self._slots is None:
+            return
+        if not page.is_closed():
+            self._idle.append(page)
+        self._slots.release()
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        await self.start()
+        page = await self._acquire()
+        try:
+            yield page
+        finally:
+            self._release(page)
@@ -0,0 +1,51 @@
+"""
+BusinessSink: persists streamed business dicts in small batches as they arrive.
+Usage:
+    async with BusinessSink(batch_size=10) as sink:
+        async for business in agent.iter_businesses():
+            await sink.add(business)
+Pending records are flushed on exit, including when the crawl fails part-way.
+A batch that fails to save is logged and counted in `failed` (its error kept in `errors`)
+so the crawl can go on; callers report saved vs failed from these counts.
+"""
+import logging
+from typing import Dict, List
+from agentic_marketing.database import AsyncSessionLocal
+from agentic_marketing.repositories.businesses import async_upsert_businesses
+
+logger = logging.getLogger(__name__)
+
+class BusinessSink:
+    def __init__(self, batch_size: int = 10):
+        self.batch_size = max(1, batch_size)
+        self.saved = 0
+        self.failed = 0
+        self.errors: List[str] = []
+        self._pending: List[Dict] = []
+
+    async def __aenter__(self) -> "BusinessSink":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.flush()
+
+    async def add(self, business: Dict):
+        self._pending.append(business)
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        try:
+            async with AsyncSessionLocal() as session:
+                await async_upsert_businesses(session, batch)
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Error saving batch of {len(batch)} businesses: {e}")
+            self.failed += len(batch)
+            self.errors.append(str(e))
+            return
+        self.saved += len(batch)
+        logger.info(f"Saved {len(batch)} businesses ({self.saved} total).")
@@ -0,0 +1,44 @@
+"""
+Per-provider concurrency limits shared by every agent running on the same event loop,
+and a helper for driving coroutines from synchronous callers such as Streamlit.
+"""
+import asyncio
+import weakref
+from typing import Dict
+from agentic_marketing.config import TAVILY_MAX_CONCURRENCY
+
+PROVIDER_LIMITS: Dict[str, int] = {
+    "tavily": TAVILY_MAX_CONCURRENCY,
+}
+DEFAULT_LIMIT = 4
+
+# Semaphores are bound to the loop that first waits on them, so keep one set per loop.
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+
+def set_provider_limit(provider: str, limit: int):
+    """
+    Override a provider's limit. Only affects event loops that have not used the provider yet.
+    """
+    PROVIDER_LIMITS[provider] = max(1, limit)
+
+
+def provider_semaphore(provider: str) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphores = _semaphores.setdefault(loop, {})
+    if provider not in semaphores:
+        semaphores[provider] = asyncio.Semaphore(PROVIDER_LIMITS.get(provider, DEFAULT_LIMIT))
+    return semaphores[provider]
+
+
+def run_sync(coro):
+    """
+    Runs a coroutine to completion from synchronous code, reusing the thread's event loop
+    so loop-bound resources (semaphores, DB connections) survive across calls.
+    """
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+    return loop.run_until_complete(coro)
@@ -0,0 +1,20 @@
+"""
+Fingerprints of the inputs a lead score is computed from.
+businesses.input_fingerprint is a generated column using FINGERPRINT_SQL, and
+business_fingerprint() computes the same value in Python for the dict a scorer used,
+so a Lead can record exactly which inputs it was scored from.
+"""
+import hashlib
+from typing import Dict
+
+SCORING_INPUT_FIELDS = ("name", "region", "industry", "description", "yelp_description", "trends")
+FIELD_SEPARATOR = "\x1f"
+
+# Must stay byte-for-byte equivalent to business_fingerprint(). Generated columns need an
+# immutable expression, so this uses || rather than concat_ws().
+FINGERPRINT_SQL = "md5(" + " || chr(31) || ".join(f"coalesce({f}, '')" for f in SCORING_INPUT_FIELDS) + ")"
+
+
+def business_fingerprint(business: Dict) -> str:
+    payload = FIELD_SEPARATOR.join(str(business.get(field) or "") for field in SCORING_INPUT_FIELDS)
+    return hashlib.md5(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,104 @@
+"""
+Content-addressed cache for LLM answers, shared by every agent.
+- Keys hash the model, instructions, model settings, output schema and prompt, so a
+  byte-identical request is answered from the cache instead of the API.
+- The default backend is a persistent SQLiteCache (TTL + LRU eviction + hit/miss counters);
+  swap it with set_llm_cache() for any object with the same get/set/stats interface.
+"""
+import json
+import logging
+from typing import Any, Awaitable, Callable, Optional
+from pydantic import BaseModel
+from agents import Agent, AgentOutputSchema, Runner
+from agents.models import get_default_model
+from agentic_marketing.config import LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_TTL_HOURS, LLM_CACHE_MAX_ENTRIES
+from agentic_marketing.utils.disk_cache import SQLiteCache, make_cache_key
+
+logger = logging.getLogger(__name__)
+
+_cache: Optional[Any] = None
+
+
+def get_llm_cache():
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = SQLiteCache(LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_HOURS * 3600, max_entries=LLM_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def set_llm_cache(cache):
+    global _cache
+    _cache = cache
+
+
+def llm_cache_key(model: str, instructions: str, output_schema: Any, prompt: str, settings: Any = None) -> str:
+    return make_cache_key("llm", model, instructions, output_schema, settings, prompt)
+
+
+def _output_model(agent: Agent) -> Optional[type]:
+    output_type = agent.output_type
+    if isinstance(output_type, AgentOutputSchema):
+        output_type = output_type.output_type
+    return output_type if isinstance(output_type, type) and issubclass(output_type, BaseModel) else None
+
+
+def agent_cache_key(agent: Agent, prompt: str) -> str:
+    # The model the SDK will actually call, so a new SDK default does not serve the old model's answers.
+    model = agent.model if isinstance(agent.model, str) else get_default_model()
+    output_model = _output_model(agent)
+    schema = output_model.model_json_schema() if output_model else None
+    return llm_cache_key(model, agent.instructions, schema, prompt, agent.model_settings.to_json_dict())
+
+
+def _decode(agent: Agent, value: str):
+    output_model = _output_model(agent)
+    return output_model.model_validate_json(value) if output_model else json.loads(value)
+
+
+def _encode(output: Any) -> str:
+    return output.model_dump_json() if isinstance(output, BaseModel) else json.dumps(output)
+
+
+def get_cached_output(agent: Agent, prompt: str):
+    """
+    Returns the cached final output of `agent` for `prompt`, or None.
+    """
+    cache = get_llm_cache()
+    value = cache.get(agent_cache_key(agent, prompt)) if cache else None
+    if value is None:
+        return None
+    logger.debug(f"LLM cache hit for agent '{agent.name}'")
+    return _decode(agent, value)
+
+
+def cache_output(agent: Agent, prompt: str, output: Any):
+    cache = get_llm_cache()
+    if cache:
+        cache.set(agent_cache_key(agent, prompt), _encode(output))
+
+
+async def run_agent_cached(agent: Agent, prompt: str, run: Optional[Callable[[], Awaitable[Any]]] = None):
+    """
+    Returns the agent's final output for `prompt`, from the cache when possible.
+    `run` performs the real call and must return a RunResult (default: Runner.run(agent, prompt)).
+    """
+    cached = get_cached_output(agent, prompt)
+    if cached is not None:
+        return cached
+    result = await (run() if run else Runner.run(agent, prompt))
+    cache_output(agent, prompt, result.final_output)
+    return result.final_output
+
+
+def run_agent_cached_sync(agent: Agent, prompt: str):
+    """
+    Synchronous variant of run_agent_cached for Runner.run_sync callers.
+    """
+    cached = get_cached_output(agent, prompt)
+    if cached is not None:
+        return cached
+    result = Runner.run_sync(agent, prompt)
+    cache_output(agent, prompt, result.final_output)
+    return result.final_output
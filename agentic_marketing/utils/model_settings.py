@@ -0,0 +1,31 @@
+"""
+Output caps for Agents SDK agents that keep the SDK's per-model defaults.
+A bare ModelSettings(max_tokens=...) replaces those defaults (for GPT-5 models: reasoning effort
+and verbosity), so the model falls back to its own reasoning effort. capped_model_settings()
+resolves the cap on top of the defaults instead, and since reasoning tokens count against
+max_tokens, adds headroom for the reasoning effort in effect.
+"""
+from typing import Optional
+from agents import ModelSettings
+from agents.models import get_default_model, get_default_model_settings, gpt_5_reasoning_settings_required
+
+# Reasoning tokens to allow per call, by reasoning effort.
+REASONING_TOKEN_ALLOWANCE = {"none": 0, "minimal": 256, "low": 1024, "medium": 4096, "high": 16384, "xhigh": 32768}
+
+
+def reasoning_allowance(settings: ModelSettings, model: Optional[str] = None) -> int:
+    effort = settings.reasoning.effort if settings.reasoning else None
+    if effort is None:
+        # No effort sent: reasoning models use their own default (medium), other models don't reason.
+        name = model or get_default_model()
+        effort = "medium" if gpt_5_reasoning_settings_required(name) or name.startswith("o") else "none"
+    return REASONING_TOKEN_ALLOWANCE.get(effort, REASONING_TOKEN_ALLOWANCE["medium"])
+
+
+def capped_model_settings(output_tokens: int, model: Optional[str] = None) -> ModelSettings:
+    """
+    SDK default settings for `model` (default: the SDK default model) with max_tokens set to
+    output_tokens plus the reasoning allowance.
+    """
+    defaults = get_default_model_settings(model)
+    return defaults.resolve(ModelSettings(max_tokens=output_tokens + reasoning_allowance(defaults, model)))
@@ -0,0 +1,85 @@
+"""
+Event-driven page readiness for the Playwright scraper.
+- Waits on selectors instead of fixed sleeps, with timeouts that adapt to observed page latency.
+- Network idle is only used as a short, best-effort settle step: Maps keeps background requests open.
+"""
+import logging
+import time
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+
+logger = logging.getLogger(__name__)
+
+class AdaptiveTimeout:
+    """
+    Tracks an exponentially weighted moving average of how long a wait took and
+    derives the next timeout from it, clamped to [min_ms, max_ms].
+    """
+    def __init__(self, initial_ms: float, min_ms: float, max_ms: float, factor: float = 3.0, alpha: float = 0.3):
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.factor = factor
+        self.alpha = alpha
+        self.average_ms = initial_ms / factor
+
+    @property
+    def timeout_ms(self) -> float:
+        return max(self.min_ms, min(self.max_ms, self.average_ms * self.factor))
+
+    def observe(self, elapsed_ms: float):
+        self.average_ms = self.alpha * elapsed_ms + (1 - self.alpha) * self.average_ms
+
+
+async def wait_for_ready(page: Page, selector: str, timeout: AdaptiveTimeout) -> bool:
+    """
+    Waits until `selector` is attached. Returns False instead of raising if it never appears.
+    """
+    started = time.monotonic()
+    try:
+        await page.wait_for_selector(selector, state="attached", timeout=timeout.timeout_ms)
+        ready = True
+    except PlaywrightTimeoutError:
+        logger.warning(f"Timed out after {timeout.timeout_ms:.0f}ms waiting for {selector!r}")
+        ready = False
+    timeout.observe((time.monotonic() - started) * 1000)
+    return ready
+
+
+async def settle(page: Page, timeout_ms: float = 1500):
+    """
+    Gives in-flight XHRs a short chance to finish; never fails the scrape.
+    """
+    try:
+        await page.wait_for_load_state("networkidle", timeout=timeout_ms)
+    except PlaywrightTimeoutError:
+        pass
+
+
+async def scroll_until(page: Page, feed_selector: str, item_selector: str, target: int,
+                       timeout: AdaptiveTimeout, end_selector: str = "", max_stalls: int = 3) -> int:
+    """
+    Scrolls a lazily loaded results feed until at least `target` items are rendered,
+    the end-of-list marker appears, or scrolling stops producing new items.
+    Returns the number of rendered items.
+    """
+    count = await page.locator(item_selector).count()
+    if not await page.locator(feed_selector).count():
+        # A single exact match opens the place page directly; there is no feed to scroll.
+        return count
+    stalls = 0
+    while count < target and stalls < max_stalls:
+        if end_selector and await page.locator(end_selector).count():
+            break
+        await page.eval_on_selector(feed_selector, "el => el.scrollBy(0, el.scrollHeight)")
+        started = time.monotonic()
+        try:
+            await page.wait_for_function(
+                "([sel, n]) => document.querySelectorAll(sel).length > n",
+                arg=[item_selector, count],
+                timeout=timeout.timeout_ms,
+            )
+            timeout.observe((time.monotonic() - started) * 1000)
+            stalls = 0
+        except PlaywrightTimeoutError:
+            stalls += 1
+        count = await page.locator(item_selector).count()
+    return count
@@ -0,0 +1,74 @@
+"""
+Incremental parsing of JSON that is still being streamed.
+parse_partial_json() returns the largest value that can be read from a prefix of a JSON document:
+open strings that are values are closed (so long texts appear as they are written), open
+containers are closed, and a trailing key or number that may still grow is left out.
+"""
+import json
+import re
+from typing import Any, List, Optional
+
+_INCOMPLETE_UNICODE_ESCAPE = re.compile(r"(\\+)u[0-9a-fA-F]{0,3}$")
+
+
+def _close_string(text: str, dangling_escape: bool) -> str:
+    # Drop an escape sequence cut off mid-way; it would make the closing quote invalid.
+    if dangling_escape:
+        return text[:-1] + '"'
+    match = _INCOMPLETE_UNICODE_ESCAPE.search(text)
+    if match and len(match.group(1)) % 2 == 1:
+        text = text[:match.start()] + match.group(1)[:-1]
+    return text + '"'
+
+
+def parse_partial_json(text: str) -> Optional[Any]:
+    """
+    Returns the parsed prefix, or None if nothing usable has arrived yet.
+    """
+    closers: List[str] = []
+    # Per open container: True while an object expects a key (always False for arrays).
+    expect_key: List[bool] = []
+    in_string = escape = string_is_key = False
+    # Longest prefix that ends on a complete value, and the closers it needs.
+    safe, safe_closers = 0, ""
+
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+                if not string_is_key:
+                    safe, safe_closers = i + 1, "".join(reversed(closers))
+            continue
+        if ch == '"':
+            in_string = True
+            string_is_key = bool(expect_key) and expect_key[-1]
+        elif ch in "{[":
+            closers.append("}" if ch == "{" else "]")
+            expect_key.append(ch == "{")
+            safe, safe_closers = i + 1, "".join(reversed(closers))
+        elif ch in "}]":
+            if closers:
+                closers.pop()
+                expect_key.pop()
+            safe, safe_closers = i + 1, "".join(reversed(closers))
+        elif ch == ":" and expect_key:
+            expect_key[-1] = False
+        elif ch == ",":
+            if closers and closers[-1] == "}":
+                expect_key[-1] = True
+            safe, safe_closers = i, "".join(reversed(closers))
+
+    candidates = []
+    if in_string and not string_is_key:
+        candidates.append(_close_string(text, escape) + "".join(reversed(closers)))
+    candidates.append(text[:safe] + safe_closers)
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            continue
+    return None
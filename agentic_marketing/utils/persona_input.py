@@ -1,41 +1,54 @@
 """
 Utility to fetch leads joined with business info for persona and marketing agent input.
+One joined query selecting only the fields the persona agent reads; rows come back as
+read-only mappings (lead["name"], lead.get("trends")), without hydrating ORM objects.
 """
-from typing import List, Dict
+import logging
+from typing import Iterator, List, Mapping
+from sqlalchemy import select
 from agentic_marketing.models import Lead, Business
 from agentic_marketing.database import SessionLocal
-from sqlalchemy.orm import joinedload
 
-def get_leads_with_business_info(lead_ids: List[int]) -> List[Dict]:
+logger = logging.getLogger(__name__)
+
+# Lead ids per query in iter_leads_with_business_info, keeping the IN list bounded.
+LEAD_INPUT_BATCH_SIZE = 1000
+
+
+def select_leads_with_business_info(lead_ids: List[int]):
+    # Outer join: a lead is returned even if its business is gone, with the business fields as None.
+    return (
+        select(
+            Lead.id, Lead.reasoning, Lead.predicted_probability,
+            Business.name, Business.industry, Business.region,
+            Business.description, Business.yelp_description, Business.trends,
+        )
+        .outerjoin(Business, Business.id == Lead.business_id)
+        .where(Lead.id.in_(lead_ids))
+    )
+
+
+def get_leads_with_business_info(lead_ids: List[int]) -> List[Mapping]:
     """
-    Fetches leads by id, joined with their business info, returns dicts for persona agent.
+    Fetches leads by id, joined with their business info, returns mappings for persona agent.
     """
-    import logging
-    logger = logging.getLogger("persona_input_debug")
-    logger.warning(f"get_leads_with_business_info called with lead_ids: {lead_ids}")
+    if not lead_ids:
+        return []
     with SessionLocal() as session:
-        leads = session.query(Lead).filter(Lead.id.in_(lead_ids)).all()
-        business_ids = [lead.business_id for lead in leads]
-        businesses = {b.id: b for b in session.query(Business).filter(Business.id.in_(business_ids)).all()}
-        logger.warning(f"Fetched {len(leads)} leads and {len(businesses)} businesses from DB.")
-        results = []
-        for lead in leads:
-            business = businesses.get(lead.business_id)
-            logger.warning(f"Lead: id={lead.id}, business_id={lead.business_id}, business={business}")
-            if business:
-                logger.warning(f"Business fields: name={business.name}, industry={business.industry}, region={business.region}, description={business.description}, yelp_description={getattr(business, 'yelp_description', None)}, trends={getattr(business, 'trends', None)}")
-            else:
-                logger.warning(f"No business found for lead id={lead.id}")
-            results.append({
-                "id": lead.id,
-                "reasoning": lead.reasoning,
-                "predicted_probability": lead.predicted_probability,
-                "name": business.name if business else None,
-                "industry": business.industry if business else None,
-                "region": business.region if business else None,
-                "description": business.description if business else None,
-                "yelp_description": getattr(business, "yelp_description", None) if business else None,
-                "trends": getattr(business, "trends", None) if business else None,
-            })
-        logger.warning(f"Returning {len(results)} results from get_leads_with_business_info.")
-        return results
+        rows = session.execute(select_leads_with_business_info(lead_ids)).mappings().all()
+    logger.debug("Fetched %d of %d requested leads.", len(rows), len(lead_ids))
+    return rows
+
+
+def iter_leads_with_business_info(lead_ids: List[int], batch_size: int = LEAD_INPUT_BATCH_SIZE) -> Iterator[List[Mapping]]:
+    """
+    Batched variant of get_leads_with_business_info for many lead ids: one query per
+    batch_size ids, yielding each batch's rows. Every batch uses its own short session, so
+    the consumer can do slow work between batches without holding a connection.
+    """
+    for start in range(0, len(lead_ids), batch_size):
+        chunk = lead_ids[start:start + batch_size]
+        with SessionLocal() as session:
+            rows = session.execute(select_leads_with_business_info(chunk)).mappings().all()
+        logger.debug("Fetched %d of %d requested leads (batch at %d).", len(rows), len(chunk), start)
+        yield rows
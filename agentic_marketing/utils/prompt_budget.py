@@ -0,0 +1,121 @@
+"""
+Token-budgeted prompt assembly.
+- count_tokens uses tiktoken when it is installed and falls back to estimate_tokens otherwise.
+- PromptBudget.fit cleans the variable fields of a prompt (whitespace, sentences repeated within
+  or across fields), caps each field, then shrinks the largest fields until the total fits the
+  budget. Text is cut at a sentence boundary where one is close enough.
+"""
+import logging
+import re
+from functools import lru_cache
+from typing import Dict, Optional, Set
+from agentic_marketing.utils.rate_limit import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+TRUNCATION_MARK = " …"
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # Missing package, or the BPE file cannot be downloaded: budgets stay approximate.
+        logger.info(f"tiktoken unavailable, estimating tokens from length: {e}")
+        return None
+
+
+def count_tokens(text: Optional[str]) -> int:
+    if not text:
+        return 0
+    encoding = _encoding()
+    return len(encoding.encode(text)) if encoding else estimate_tokens(text)
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    Returns text cut to at most max_tokens, preferring to end on a full sentence.
+    """
+    if max_tokens <= 0 or not text:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _encoding()
+    if encoding:
+        cut = encoding.decode(encoding.encode(text)[:max_tokens])
+    else:
+        cut = text[:max_tokens * 4]
+    boundary = max(cut.rfind(". "), cut.rfind(".\n"), cut.rfind("! "), cut.rfind("? "))
+    # Only back up to a sentence end if that keeps most of the allowance.
+    if boundary > len(cut) * 0.6:
+        cut = cut[:boundary + 1]
+    return cut.rstrip() + TRUNCATION_MARK
+
+
+def dedupe_text(text: str, seen: Optional[Set[str]] = None) -> str:
+    """
+    Collapses whitespace and drops sentences already in `seen` (updated in place), keeping
+    paragraph breaks. Pass the same set for several fields to dedupe across them.
+    """
+    seen = set() if seen is None else seen
+    paragraphs = []
+    for paragraph in re.split(r"\n\s*\n", text or ""):
+        kept = []
+        for line in paragraph.splitlines():
+            for sentence in _SENTENCE_END.split(" ".join(line.split())):
+                key = sentence.lower().strip(" .!?")
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                kept.append(sentence)
+        if kept:
+            paragraphs.append(" ".join(kept))
+    return "\n\n".join(paragraphs)
+
+
+class PromptBudget:
+    """
+    total_tokens bounds the variable fields of a prompt; field_caps bounds individual fields.
+    Fields without a cap are only limited by the total.
+    """
+    def __init__(self, total_tokens: int, field_caps: Optional[Dict[str, int]] = None):
+        self.total_tokens = total_tokens
+        self.field_caps = field_caps or {}
+
+    def _allocate(self, sizes: Dict[str, int]) -> Dict[str, int]:
+        # Water-filling: fields under the fair share keep everything, the rest split what is left.
+        allocation: Dict[str, int] = {}
+        remaining = self.total_tokens
+        pending = sorted(sizes, key=sizes.get)
+        while pending:
+            share = remaining // len(pending)
+            name = pending[0]
+            if sizes[name] > share:
+                for name in pending:
+                    allocation[name] = share
+                break
+            allocation[name] = sizes[name]
+            remaining -= sizes[name]
+            pending.pop(0)
+        return allocation
+
+    def fit(self, fields: Dict[str, Optional[str]]) -> Dict[str, str]:
+        """
+        Returns the fields cleaned and truncated to the budget, in the given order. Earlier
+        fields win when the same sentence appears in several of them.
+        """
+        seen: Set[str] = set()
+        fitted: Dict[str, str] = {}
+        for name, value in fields.items():
+            text = dedupe_text(str(value) if value is not None else "", seen)
+            cap = self.field_caps.get(name)
+            fitted[name] = truncate_tokens(text, cap) if cap is not None else text
+        sizes = {name: count_tokens(text) for name, text in fitted.items()}
+        if sum(sizes.values()) > self.total_tokens:
+            allocation = self._allocate(sizes)
+            fitted = {name: truncate_tokens(text, allocation[name]) if sizes[name] > allocation[name] else text
+                      for name, text in fitted.items()}
+        return fitted
@@ -0,0 +1,101 @@
+"""
+Rate-limit-aware scheduling for LLM calls.
+- TokenBucket / RateLimiter: bounded concurrency plus requests-per-minute and tokens-per-minute budgets.
+- retry_with_backoff: retries 429, 5xx, timeouts and connection errors with exponential backoff and jitter.
+"""
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional, TypeVar
+import openai
+from agentic_marketing.config import (
+    OPENAI_MAX_CONCURRENCY, OPENAI_REQUESTS_PER_MINUTE, OPENAI_TOKENS_PER_MINUTE, OPENAI_MAX_RETRIES,
+)
+
+logger = logging.getLogger(__name__)
+T = TypeVar("T")
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English text; good enough for budgeting.
+    return len(text or "") // 4 + 1
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        # Requests larger than the bucket would wait forever; let them through once it is full.
+        amount = min(amount, self.capacity)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.refill_per_second)
+                self._refill()
+            self.tokens -= amount
+
+
+class RateLimiter:
+    def __init__(self, max_concurrency: int = OPENAI_MAX_CONCURRENCY,
+                 requests_per_minute: int = OPENAI_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: int = OPENAI_TOKENS_PER_MINUTE):
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @asynccontextmanager
+    async def limit(self, tokens: int):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        async with self._slots:
+            await self.requests.acquire(1)
+            await self.tokens.acquire(tokens)
+            yield
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    return isinstance(exc, openai.APIStatusError) and exc.status_code >= 500
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+async def retry_with_backoff(call: Callable[[], Awaitable[T]], max_attempts: int = OPENAI_MAX_RETRIES,
+                             base_delay: float = 1.0, max_delay: float = 60.0) -> T:
+    """
+    Awaits call(), retrying retryable OpenAI errors. Honors Retry-After when the API sends it.
+    """
+    attempt = 1
+    while True:
+        try:
+            return await call()
+        except Exception as e:
+            if attempt >= max_attempts or not is_retryable(e):
+                raise
+            delay = _retry_after(e) or min(max_delay, base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+            logger.warning(f"Retryable LLM error (attempt {attempt}/{max_attempts}), retrying in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+            attempt += 1
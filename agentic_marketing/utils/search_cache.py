@@ -0,0 +1,64 @@
+"""
+Persistent cache for Tavily search responses, keyed by the full set of search parameters.
+SEARCH_CACHE_MODE:
+- "off": every lookup goes to Tavily.
+- "on": serve fresh cached responses, otherwise search and store the response.
+- "replay": serve every lookup from the cache and never touch the network; misses return no results.
+"""
+import logging
+import threading
+from typing import Callable, Dict, Optional
+from agentic_marketing.config import SEARCH_CACHE_MODE, SEARCH_CACHE_PATH, SEARCH_CACHE_TTL_HOURS, SEARCH_CACHE_MAX_ENTRIES
+from agentic_marketing.utils.disk_cache import SQLiteCache, make_cache_key
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CACHE_MODES = ("off", "on", "replay")
+
+_cache: Optional[SQLiteCache] = None
+# get_search_cache() is first called from several asyncio.to_thread workers at once.
+_cache_lock = threading.Lock()
+
+if SEARCH_CACHE_MODE not in SEARCH_CACHE_MODES:
+    raise ValueError(f"SEARCH_CACHE_MODE must be one of {SEARCH_CACHE_MODES}, got {SEARCH_CACHE_MODE!r}.")
+
+
+def get_search_cache() -> Optional[SQLiteCache]:
+    global _cache
+    if SEARCH_CACHE_MODE == "off":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            # In replay mode the cache is the only source, so nothing expires or is evicted.
+            replay = SEARCH_CACHE_MODE == "replay"
+            _cache = SQLiteCache(
+                SEARCH_CACHE_PATH,
+                ttl_seconds=None if replay else SEARCH_CACHE_TTL_HOURS * 3600,
+                max_entries=None if replay else SEARCH_CACHE_MAX_ENTRIES,
+            )
+        return _cache
+
+
+def cached_search(search: Callable[..., Dict], provider: str = "tavily", **params) -> Dict:
+    """
+    Runs `search(**params)` through the response cache according to SEARCH_CACHE_MODE.
+    """
+    cache = get_search_cache()
+    if cache is None:
+        return search(**params)
+    key = make_cache_key(provider, params)
+    response = cache.get_json(key)
+    if response is not None:
+        return response
+    if SEARCH_CACHE_MODE == "replay":
+        logger.warning(f"Search cache miss in replay mode for query: {params.get('query')!r}")
+        # A fresh dict: callers may mutate the response.
+        return {"results": []}
+    response = search(**params)
+    cache.set_json(key, response)
+    return response
+
+
+def search_cache_stats() -> Dict[str, int]:
+    cache = get_search_cache()
+    return cache.stats() if cache else {"hits": 0, "misses": 0, "entries": 0}
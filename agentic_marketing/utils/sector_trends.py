@@ -0,0 +1,85 @@
+"""
+Sector trends store: fetches Tavily sector trends at most once per (sector, region) per TTL window.
+- Fresh results live in the `sector_trends` table, so every agent and process shares them.
+- Within a process, results are memoized and concurrent requests for the same key share one fetch.
+"""
+import asyncio
+import logging
+import weakref
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from agentic_marketing.agents.social_media_finding_agent import afind_sector_trends
+from agentic_marketing.config import SECTOR_TRENDS_TTL_HOURS
+from agentic_marketing.database import AsyncSessionLocal
+from agentic_marketing.models import SectorTrend
+
+logger = logging.getLogger(__name__)
+
+_memo: Dict[Tuple[str, str], Tuple[datetime, Optional[str]]] = {}
+_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], asyncio.Lock]]" = weakref.WeakKeyDictionary()
+
+
+def _key(sector: str, region: Optional[str]) -> Tuple[str, str]:
+    return (sector or "").strip().lower(), (region or "").strip().lower()
+
+
+def _lock_for(key: Tuple[str, str]) -> asyncio.Lock:
+    locks = _locks.setdefault(asyncio.get_running_loop(), {})
+    if key not in locks:
+        locks[key] = asyncio.Lock()
+    return locks[key]
+
+
+async def _load(key: Tuple[str, str], cutoff: datetime) -> Optional[Tuple[datetime, Optional[str]]]:
+    async with AsyncSessionLocal() as session:
+        row = (await session.execute(
+            select(SectorTrend.fetched_at, SectorTrend.trends)
+            .where(SectorTrend.sector == key[0], SectorTrend.region == key[1])
+        )).first()
+    if row and row.fetched_at and row.fetched_at >= cutoff:
+        return row.fetched_at, row.trends
+    return None
+
+
+async def _store(key: Tuple[str, str], fetched_at: datetime, trends: Optional[str]):
+    stmt = insert(SectorTrend).values(sector=key[0], region=key[1], trends=trends, fetched_at=fetched_at)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_sector_trends_sector_region",
+        set_={"trends": stmt.excluded.trends, "fetched_at": stmt.excluded.fetched_at},
+    )
+    async with AsyncSessionLocal() as session:
+        await session.execute(stmt)
+        await session.commit()
+
+
+async def get_cached_sector_trends(sector: str, region: Optional[str] = None, ttl_hours: float = SECTOR_TRENDS_TTL_HOURS) -> Dict:
+    """
+    Returns {"trends": str | None} for the sector, like find_sector_trends, reusing a fresh stored result.
+    Pass region only if trends should be region specific; it is added to the search query.
+    """
+    key = _key(sector, region)
+    cutoff = datetime.utcnow() - timedelta(hours=ttl_hours)
+    cached = _memo.get(key)
+    if cached and cached[0] >= cutoff:
+        return {"trends": cached[1]}
+    async with _lock_for(key):
+        # Another task may have filled the memo while we waited.
+        cached = _memo.get(key)
+        if cached and cached[0] >= cutoff:
+            return {"trends": cached[1]}
+        try:
+            cached = await _load(key, cutoff)
+        except Exception as e:
+            logger.error(f"Sector trends lookup error for '{sector}': {e}")
+            cached = None
+        if cached is None:
+            result = await afind_sector_trends(sector, region)
+            cached = (datetime.utcnow(), result.get("trends"))
+            try:
+                await _store(key, *cached)
+            except Exception as e:
+                logger.error(f"Sector trends save error for '{sector}': {e}")
+        _memo[key] = cached
+    return {"trends": cached[1]}
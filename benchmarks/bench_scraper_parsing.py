@@ -0,0 +1,175 @@
+"""
+Offline benchmark for WebScraperAgent parsing and extraction.
+- Runs against saved Google Maps result and detail HTML in benchmarks/fixtures.
+- Playwright is replaced by FakePage/FakePool, which serve the fixtures and evaluate
+  selectors with BeautifulSoup; Tavily lookups are replaced by canned local results.
+- Reports per-page parse time, per-detail-page and per-business time, and peak memory.
+
+Usage:
+    python benchmarks/bench_scraper_parsing.py [--repeat 20] [--output bench_output.txt]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, List
+
+# Never touch the network: serve any Tavily lookup that slips through from an empty replay cache.
+os.environ.setdefault("TAVILY_API_KEY", "offline-benchmark")
+os.environ["SEARCH_CACHE_MODE"] = "replay"
+os.environ.setdefault("SEARCH_CACHE_PATH", os.path.join(os.path.dirname(__file__), ".cache", "search_cache.sqlite3"))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bs4 import BeautifulSoup
+from agentic_marketing.agents.web_scraper_agent import WebScraperAgent, RESULT_CARD_SELECTOR, OUTER_HTML_JS
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+_fragment_cache: Dict[tuple, List[str]] = {}
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class FakePage:
+    """
+    Minimal stand-in for a Playwright Page that serves fixture HTML.
+    Detail URLs alternate between the with-website and without-website fixtures.
+    """
+    def __init__(self, detail_pages: List[str]):
+        self.detail_pages = detail_pages
+        self.html = ""
+        self._visits = 0
+
+    async def goto(self, url: str):
+        self.html = self.detail_pages[self._visits % len(self.detail_pages)]
+        self._visits += 1
+
+    async def wait_for_selector(self, selector: str, **kwargs):
+        return None
+
+    async def wait_for_load_state(self, state: str = "load", **kwargs):
+        return None
+
+    async def content(self) -> str:
+        return self.html
+
+    async def eval_on_selector_all(self, selector: str, expression: str):
+        # The browser would do this work, so it is memoized to keep it out of the measurements.
+        assert expression == OUTER_HTML_JS
+        key = (id(self.html), selector)
+        if key not in _fragment_cache:
+            _fragment_cache[key] = [str(node) for node in BeautifulSoup(self.html, "lxml").select(selector)]
+        return _fragment_cache[key]
+
+    def is_closed(self) -> bool:
+        return False
+
+
+class FakePool:
+    def __init__(self, detail_pages: List[str]):
+        self._page = FakePage(detail_pages)
+
+    @asynccontextmanager
+    async def page(self):
+        yield self._page
+
+    async def close(self):
+        pass
+
+
+def make_agent(detail_pages: List[str], max_results: int) -> WebScraperAgent:
+    agent = WebScraperAgent(region="Portland, OR", sector="restaurants", max_results=max_results,
+                            pool=FakePool(detail_pages))
+
+    async def get_yelp_page(business_name: str) -> Dict:
+        return {"yelp_url": f"https://www.yelp.com/biz/{business_name.lower().replace(' ', '-')}",
+                "yelp_description": f"{business_name} is a local favourite."}
+
+    async def get_description(business_name: str) -> Dict:
+        return {"description": f"{business_name} serves the neighbourhood."}
+
+    async def get_sector_trends() -> Dict:
+        return {"trends": "Online ordering: more customers order from a business website."}
+
+    agent.get_yelp_page = get_yelp_page
+    agent.get_description = get_description
+    agent.get_sector_trends = get_sector_trends
+    return agent
+
+
+def time_it(fn: Callable, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def peak_memory_kb(fn: Callable) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(label: str, timings: List[float], per: int = 1) -> str:
+    per_item = [t / per for t in timings]
+    return (f"{label:<42} median {statistics.median(per_item):9.3f} ms   "
+            f"min {min(per_item):9.3f} ms   max {max(per_item):9.3f} ms")
+
+
+def run(repeat: int) -> List[str]:
+    results_html = load_fixture("maps_results.html")
+    detail_pages = [load_fixture("maps_detail_website.html"), load_fixture("maps_detail_no_website.html")]
+    card_fragments = "\n".join(str(card) for card in BeautifulSoup(results_html, "lxml").select(RESULT_CARD_SELECTOR))
+    agent = make_agent(detail_pages, max_results=1000)
+    candidates = agent.select_candidates(results_html)
+    n = len(candidates)
+    loop = asyncio.new_event_loop()
+    try:
+        detail_page = FakePage(detail_pages)
+        first_name, first_item = candidates[0]
+        # Sanity check so a selector regression shows up as wrong output, not as a speed-up.
+        details = loop.run_until_complete(agent.get_business_details(FakePage(detail_pages), first_name, first_item))
+        lines = [
+            f"Fixtures: {len(results_html) / 1024:.0f} KB results page, {n} result cards, "
+            f"{len(detail_pages[0]) / 1024:.0f} KB detail page; repeat={repeat}",
+            f"Extracted for {first_name!r}: {details}",
+            summarize("results page parse (full document)", time_it(lambda: agent.select_candidates(results_html), repeat)),
+            summarize("results page parse (card fragments)", time_it(lambda: agent.select_candidates(card_fragments), repeat)),
+            summarize("per card (full document)", time_it(lambda: agent.select_candidates(results_html), repeat), per=n),
+            summarize("detail page extraction", time_it(
+                lambda: loop.run_until_complete(agent.get_business_details(detail_page, first_name, first_item)), repeat)),
+            summarize("per business (parse_businesses)", time_it(
+                lambda: loop.run_until_complete(agent.parse_businesses(card_fragments)), repeat), per=n),
+            f"{'peak memory, parse_businesses':<42} {peak_memory_kb(lambda: loop.run_until_complete(agent.parse_businesses(card_fragments))):9.1f} KB",
+            f"{'peak memory, results page parse':<42} {peak_memory_kb(lambda: agent.select_candidates(results_html)):9.1f} KB",
+        ]
+    finally:
+        loop.close()
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scraper parsing benchmark.")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Also write the report to this file.")
+    args = parser.parse_args()
+    report = "\n".join(run(args.repeat))
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()